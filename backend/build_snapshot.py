@@ -0,0 +1,53 @@
+"""Dump performance rows and district metadata into a columnar snapshot.
+
+The snapshot (see snapshot.py) lets workers answer reads without MongoDB:
+ship the directory next to each worker and set PERFORMANCE_SNAPSHOT to it.
+Rebuilding in place is safe while workers are running; they pick up the new
+files on restart.
+
+Usage (from the backend directory):
+    python build_snapshot.py --out snapshot                    # Arrow IPC, memory-mapped by the app
+    python build_snapshot.py --out snapshot --format parquet   # smaller, decoded into memory on load
+"""
+import argparse
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from server import db, iter_performance_rows
+from snapshot import SNAPSHOT_FORMATS, write_snapshot
+
+logger = logging.getLogger("build_snapshot")
+
+
+async def collect() -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    rows = []
+    async for row in iter_performance_rows({}, sort=True, batch_size=5000):
+        rows.append(row)
+        if len(rows) % 100000 == 0:
+            logger.info(f"{len(rows)} rows read")
+    districts: Dict[str, Dict[str, Any]] = {}
+    async for d in db.districts.find({}, {"_id": 0}):
+        code = str(d.get("district_code", "")).strip().upper()
+        if code and code not in districts:
+            districts[code] = {**d, "district_code": code}
+    return rows, list(districts.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a columnar snapshot of the performance data")
+    parser.add_argument('--out', default='snapshot', help="snapshot directory (created if missing)")
+    parser.add_argument('--format', choices=SNAPSHOT_FORMATS, default='arrow')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    started = time.perf_counter()
+    rows, districts = asyncio.run(collect())
+    manifest = write_snapshot(Path(args.out), rows, districts, args.format)
+    logger.info(f"{manifest} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
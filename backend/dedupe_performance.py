@@ -0,0 +1,62 @@
+"""Remove duplicate performance_data rows and create the unique index.
+
+Older deployments could store the same (district_code, year, month) twice,
+which keeps the app from creating its unique index on startup (it logs an
+error and runs without it). This keeps the oldest row of each month and
+deletes the rest, then creates the indexes. Rebuild the rollups afterwards
+(python rollups.py) if the duplicates were counted in them.
+
+Usage (from the backend directory):
+    python dedupe_performance.py --dry-run   # count the rows that would be removed
+    python dedupe_performance.py
+"""
+import argparse
+import asyncio
+import logging
+
+from server import PERFORMANCE_KEY_FIELDS, db, ensure_indexes
+
+logger = logging.getLogger("dedupe_performance")
+
+
+async def dedupe_performance_data(dry_run: bool = False) -> int:
+    """Remove duplicate (district_code, year, month) rows, keeping the oldest
+    one; returns the number of rows removed (or that would be)."""
+    pipeline = [
+        {"$sort": {"_id": 1}},
+        {"$group": {
+            "_id": {f: f"${f}" for f in PERFORMANCE_KEY_FIELDS},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    removed = 0
+    async for group in db.performance_data.aggregate(pipeline, allowDiskUse=True):
+        if dry_run:
+            removed += group["count"] - 1
+            continue
+        result = await db.performance_data.delete_many({"_id": {"$in": group["ids"][1:]}})
+        removed += result.deleted_count
+    return removed
+
+
+async def dedupe(dry_run: bool) -> int:
+    removed = await dedupe_performance_data(dry_run)
+    if not dry_run:
+        await ensure_indexes()
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove duplicate performance_data rows")
+    parser.add_argument('--dry-run', action='store_true', help="only count the duplicate rows")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    removed = asyncio.run(dedupe(args.dry_run))
+    logger.info(f"{'Found' if args.dry_run else 'Removed'} {removed} duplicate rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""In-memory registry of district metadata.
+
+Built once from the seed data (states_data plus data/up_districts.json) and
+rebuilt at startup with whatever the database holds, so lookups by code, by
+state and by name prefix never touch MongoDB or re-read the data file.
+
+Name search works on normalized keys (see normalize_name) kept in one sorted
+list: a prefix query is a bisect to the first candidate followed by a scan of
+the keys sharing that prefix. Districts with coordinates are also indexed in
+a KD-tree (spatial.SpatialIndex) for nearest-district lookups.
+"""
+import json
+import logging
+import re
+import unicodedata
+import uuid
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from spatial import SpatialIndex
+from states_data import INDIAN_STATES, STATE_DISTRICTS, get_districts_for_state
+from synthetic_data import ID_NAMESPACE
+
+DATA_DIR = Path(__file__).parent / 'data'
+
+# Devanagari nukta: "अलीगढ़" is often typed as "अलीगढ"
+_NUKTA = "़"
+_SEPARATORS = re.compile(r"[\s\-_.,/()]+")
+
+# Match kinds, best first
+MATCH_CODE, MATCH_NAME, MATCH_WORD = 0, 1, 2
+
+
+def normalize_name(text: str) -> str:
+    """Search key for a district name in either script: NFC, case-folded,
+    nukta dropped and punctuation runs collapsed to one space."""
+    text = unicodedata.normalize("NFC", text or "").casefold().replace(_NUKTA, "")
+    return _SEPARATORS.sub(" ", text).strip()
+
+
+def load_seed_districts(state_code: str) -> List[Dict[str, Any]]:
+    """Raw district entries for a state: the full UP list from the data file,
+    otherwise (or if the file is unusable) the sample list in states_data."""
+    known = get_districts_for_state(state_code)
+    if state_code == "UP":
+        data_file = DATA_DIR / 'up_districts.json'
+        try:
+            if data_file.exists():
+                with open(data_file, 'r', encoding='utf-8') as f:
+                    file_items = json.load(f)
+                if file_items:
+                    # The data file has no coordinates; borrow them from states_data
+                    coords = {
+                        str(d["district_code"]).strip().upper(): (d.get("latitude"), d.get("longitude"))
+                        for d in known
+                    }
+                    for d in file_items:
+                        lat_lon = coords.get(str(d.get("district_code", "")).strip().upper())
+                        if lat_lon and d.get("latitude") is None:
+                            d["latitude"], d["longitude"] = lat_lon
+                    return file_items
+            else:
+                logging.warning(f"District data file not found: {data_file}. Seeding minimal defaults.")
+        except Exception as e:
+            logging.warning(f"Failed to load districts file: {e}. Using minimal list.")
+    return list(known)
+
+
+def district_entry(d: Dict[str, Any], state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Normalized district metadata, or None without a usable code."""
+    code = str(d.get("district_code", "")).strip().upper()
+    if not code:
+        return None
+    name_en = (d.get("district_name") or "").strip()
+    return {
+        "district_code": code,
+        "district_name": name_en,
+        "district_name_hi": (d.get("district_name_hi") or name_en).strip(),
+        "state_code": state["code"],
+        "state_name": d.get("state_name") or state["name"],
+        "state_name_hi": d.get("state_name_hi") or state["name_hi"],
+        "latitude": d.get("latitude"),
+        "longitude": d.get("longitude"),
+    }
+
+
+def seed_entries() -> List[Dict[str, Any]]:
+    """District metadata for every state with seed data."""
+    states_by_code = {s["code"]: s for s in INDIAN_STATES}
+    entries = []
+    for state_code in STATE_DISTRICTS:
+        state = states_by_code.get(state_code, {"code": state_code, "name": "", "name_hi": ""})
+        for d in load_seed_districts(state_code):
+            entry = district_entry(d, state)
+            if entry:
+                entries.append(entry)
+    return entries
+
+
+class DistrictRegistry:
+    """Immutable indexes over district metadata; build a new one to update."""
+
+    def __init__(self, districts: Iterable[Dict[str, Any]]):
+        states_by_code = {s["code"]: s for s in INDIAN_STATES}
+        self.by_code: Dict[str, Dict[str, Any]] = {}
+        for d in districts:
+            state_code = str(d.get("state_code") or "").strip().upper()
+            state = states_by_code.get(state_code, {"code": state_code, "name": "", "name_hi": ""})
+            entry = district_entry(d, state)
+            if entry is None:
+                continue
+            # Later sources (the database) override the seed data
+            entry["id"] = d.get("id") or str(uuid.uuid5(ID_NAMESPACE, f"district:{entry['district_code']}"))
+            self.by_code[entry["district_code"]] = entry
+
+        self.by_state: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in sorted(self.by_code.values(), key=lambda e: (e["district_name"], e["district_code"])):
+            self.by_state.setdefault(entry["state_code"], []).append(entry)
+
+        keys: List[Tuple[str, int, str]] = []
+        for code, entry in self.by_code.items():
+            keys.append((code.casefold(), MATCH_CODE, code))
+            for name in {entry["district_name"], entry["district_name_hi"]}:
+                words = normalize_name(name).split(" ")
+                if not words[0]:
+                    continue
+                keys.append((" ".join(words), MATCH_NAME, code))
+                # Later words too, so "nagar" finds "Ambedkar Nagar"
+                keys.extend((" ".join(words[i:]), MATCH_WORD, code) for i in range(1, len(words)))
+        keys.sort()
+        self._keys = [k for k, _, _ in keys]
+        self._matches = [(kind, code) for _, kind, code in keys]
+
+        self._located = [
+            code for code, entry in self.by_code.items()
+            if entry["latitude"] is not None and entry["longitude"] is not None
+        ]
+        self.spatial = SpatialIndex(
+            [(self.by_code[c]["latitude"], self.by_code[c]["longitude"]) for c in self._located]
+        )
+
+        self.states = [
+            {**s, "district_count": len(self.by_state.get(s["code"], []))} for s in INDIAN_STATES
+        ]
+
+    def __len__(self) -> int:
+        return len(self.by_code)
+
+    def get(self, district_code: str) -> Optional[Dict[str, Any]]:
+        return self.by_code.get(district_code.strip().upper())
+
+    def districts(self, state_code: str) -> List[Dict[str, Any]]:
+        """A state's districts ordered by English name."""
+        return list(self.by_state.get(state_code.upper(), []))
+
+    def search(self, query: str, state_code: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Districts whose code, name or a word of the name starts with `query`.
+
+        Code matches come first, then full-name prefixes, then word prefixes;
+        ties are broken by name.
+        """
+        prefix = normalize_name(query)
+        if not prefix:
+            return []
+        state_code = state_code.upper() if state_code else None
+        best: Dict[str, int] = {}
+        i = bisect_left(self._keys, prefix)
+        while i < len(self._keys) and self._keys[i].startswith(prefix):
+            kind, code = self._matches[i]
+            if kind < best.get(code, MATCH_WORD + 1):
+                best[code] = kind
+            i += 1
+        ranked = sorted(
+            (kind, self.by_code[code]["district_name"], code)
+            for code, kind in best.items()
+            if state_code is None or self.by_code[code]["state_code"] == state_code
+        )
+        return [self.by_code[code] for _, _, code in ranked[:limit]]
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[Dict[str, Any], float]]:
+        """The k districts closest to a point, with great-circle distances in km."""
+        return [(self.by_code[self._located[i]], km) for i, km in self.spatial.nearest(lat, lon, k)]
@@ -0,0 +1,419 @@
+"""Bulk ingestion of the data.gov.in MGNREGA resource into performance_data.
+
+Walks the whole DATA_GOV_RESOURCE_ID with offset/limit pagination, maps each
+page of records to PerformanceData rows and writes them with unordered
+bulk upserts. Pages are parsed column-wise with pandas against a field
+mapping compiled once per distinct field list (see parse_page). The state
+and fiscal-year rollups touched by each page are recomputed after it is
+written. Progress is checkpointed after every page so an interrupted run
+can pick up where it stopped.
+
+Usage (from the backend directory):
+    python ingest.py                      # full refresh from offset 0
+    python ingest.py --resume             # continue from the last checkpoint
+    python ingest.py --base-url http://127.0.0.1:9000 --page-size 500
+"""
+import argparse
+import asyncio
+import json
+import logging
+import re
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+
+from server import (
+    DATA_GOV_API_KEY,
+    DATA_GOV_BASE_URL,
+    DATA_GOV_RESOURCE_ID,
+    DATA_GOV_TIMEOUT,
+    PERFORMANCE_KEY_FIELDS,
+    BUCKETED_STORAGE,
+    DATA_GOV_INT_FIELDS,
+    PerformanceData,
+    compile_field_mapping,
+    db,
+    fiscal_year_of,
+    map_data_gov_record,
+    performance_bucket_ops,
+    recompute_rollups,
+    refresh_district_registry,
+    state_code_for_district,
+)
+
+logger = logging.getLogger("ingest")
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_CHECKPOINT = Path(__file__).parent / '.ingest_checkpoint.json'
+
+DISTRICT_CODE_FIELDS = ['district_code', 'district_cd', 'districtcode']
+MONTH_FIELDS = ['month', 'month_no', 'mnth']
+YEAR_FIELDS = ['year', 'calendar_year']
+FIN_YEAR_FIELDS = ['fin_year', 'financial_year', 'fy']
+KEY_FIELD_ALIASES = {
+    'district_code': DISTRICT_CODE_FIELDS,
+    'month': MONTH_FIELDS,
+    'year': YEAR_FIELDS,
+    'fin_year': FIN_YEAR_FIELDS,
+}
+
+MONTH_NAMES = {
+    name: i + 1
+    for i, names in enumerate([
+        ('jan', 'january'), ('feb', 'february'), ('mar', 'march'), ('apr', 'april'),
+        ('may',), ('jun', 'june'), ('jul', 'july'), ('aug', 'august'),
+        ('sep', 'sept', 'september'), ('oct', 'october'), ('nov', 'november'), ('dec', 'december'),
+    ])
+    for name in names
+}
+
+
+def _first(rec: Dict[str, Any], keys: List[str]) -> Optional[str]:
+    for k in keys:
+        value = rec.get(k)
+        if value not in (None, ""):
+            return str(value).strip()
+    return None
+
+
+def resolve_record_key(rec: Dict[str, Any]) -> Optional[Tuple[str, int, int]]:
+    """Return (district_code, month, year) for an upstream record, or None.
+
+    Months may be numbers or names. When only a financial year such as
+    "2024-2025" is present, Jan-Mar belong to its second calendar year.
+    """
+    code = _first(rec, DISTRICT_CODE_FIELDS)
+    raw_month = _first(rec, MONTH_FIELDS)
+    if not code or not raw_month:
+        return None
+
+    month = MONTH_NAMES.get(raw_month.lower())
+    if month is None:
+        try:
+            month = int(float(raw_month))
+        except ValueError:
+            return None
+    if not 1 <= month <= 12:
+        return None
+
+    raw_year = _first(rec, YEAR_FIELDS)
+    if raw_year is not None:
+        try:
+            year = int(float(raw_year))
+        except ValueError:
+            return None
+    else:
+        fin_year = _first(rec, FIN_YEAR_FIELDS)
+        if not fin_year:
+            return None
+        try:
+            start_year = int(fin_year.split('-')[0])
+        except ValueError:
+            return None
+        year = start_year + 1 if month <= 3 else start_year
+
+    return code.upper(), month, year
+
+
+def parse_records(records: Iterable[Dict[str, Any]], stats: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+    """Yield PerformanceData rows for the records that carry a usable key."""
+    for rec in records:
+        key = resolve_record_key(rec)
+        if key is None:
+            stats['skipped'] += 1
+            continue
+        yield PerformanceData(**map_data_gov_record(rec, *key)).model_dump()
+
+
+@lru_cache(maxsize=32)
+def compile_schema(columns: FrozenSet[str]) -> Dict[str, List[str]]:
+    """Source columns for every key and metric field, in priority order.
+
+    Compiled once per distinct field list; callers must not mutate the result.
+    """
+    schema = compile_field_mapping(columns)
+    for field, aliases in KEY_FIELD_ALIASES.items():
+        schema[field] = [a for a in aliases if a in columns]
+    return schema
+
+
+def _text_column(records: List[Dict[str, Any]], columns: List[str]) -> np.ndarray:
+    """Per record, the first non-empty value across `columns` as stripped text
+    (None when there is none), matching _first."""
+    result: List[Optional[str]] = [None] * len(records)
+    for col in columns:
+        values = [rec.get(col) for rec in records]
+        result = [
+            r if r is not None or v is None or v == "" else str(v).strip()
+            for r, v in zip(result, values)
+        ]
+    return np.array(result, dtype=object)
+
+
+def _to_float(values: np.ndarray) -> np.ndarray:
+    return pd.to_numeric(values, errors='coerce').astype(np.float64)
+
+
+def _first_number(records: List[Dict[str, Any]], columns: List[str]) -> np.ndarray:
+    """Per record, the first value across `columns` that parses as a number
+    (else 0), matching pick_num."""
+    result = np.full(len(records), np.nan)
+    for col in columns:
+        missing = np.isnan(result)
+        if not missing.any():
+            break
+        parsed = _to_float(np.array([rec.get(col) for rec in records], dtype=object))
+        result[missing] = parsed[missing]
+    return np.nan_to_num(result, nan=0.0)
+
+
+def parse_page(records: List[Dict[str, Any]], stats: Dict[str, int]) -> List[Dict[str, Any]]:
+    """Vectorized equivalent of parse_records for a whole page (up to the
+    rounding of half-cent ties in float fields).
+
+    The page's field list is compiled to a column mapping once; each mapped
+    column is then pulled out of the page a single time and coerced as a
+    NumPy array, and rows are only materialized as dicts at the end.
+    """
+    if not records:
+        return []
+    schema = compile_schema(frozenset().union(*records))
+
+    code = _text_column(records, schema['district_code'])
+    raw_month = _text_column(records, schema['month'])
+    month = np.trunc(_to_float(raw_month))
+    named = np.isnan(month) & pd.notna(raw_month)
+    if named.any():
+        month[named] = [MONTH_NAMES.get(m.lower(), np.nan) for m in raw_month[named]]
+
+    # A year that is present but unparsable skips the row, as in resolve_record_key
+    raw_year = _text_column(records, schema['year'])
+    year = np.trunc(_to_float(raw_year))
+    from_fin_year = pd.isna(raw_year)
+    if schema['fin_year'] and from_fin_year.any():
+        fin_year = _text_column(records, schema['fin_year'])
+        start = np.array([
+            f.split('-')[0].strip() if f else None for f in fin_year
+        ], dtype=object)
+        integral = np.array([s is not None and re.fullmatch(r'[+-]?\d+', s) is not None for s in start])
+        start_year = np.where(integral, _to_float(start), np.nan)
+        year[from_fin_year] = (start_year + (month <= 3))[from_fin_year]
+
+    with np.errstate(invalid='ignore'):
+        valid = pd.notna(code) & (code != "") & (month >= 1) & (month <= 12) & ~np.isnan(year)
+    stats['skipped'] += int((~valid).sum())
+    if not valid.any():
+        return []
+
+    if not valid.all():
+        records = [rec for rec, ok in zip(records, valid) if ok]
+    columns: Dict[str, List[Any]] = {
+        'id': [str(uuid.uuid4()) for _ in records],
+        'district_code': [c.upper() for c in code[valid]],
+        'month': month[valid].astype(np.int64).tolist(),
+        'year': year[valid].astype(np.int64).tolist(),
+    }
+    for field in (f for f in schema if f not in KEY_FIELD_ALIASES):
+        values = _first_number(records, schema[field])
+        if field in DATA_GOV_INT_FIELDS:
+            columns[field] = np.trunc(values).astype(np.int64).tolist()
+        else:
+            # np.round scales by 100 first, so a value within float error of a
+            # half cent (e.g. 79740.425) may round the other way than round()
+            columns[field] = np.round(values, 2).tolist()
+
+    columns['timestamp'] = [datetime.now(timezone.utc)] * len(records)
+
+    names = [f for f in PerformanceData.model_fields if f in columns]
+    return [dict(zip(names, row)) for row in zip(*(columns[f] for f in names))]
+
+
+def _upsert_op(doc: Dict[str, Any]) -> UpdateOne:
+    # Ingestion is authoritative: refresh metrics, but keep the original id
+    fields = {k: v for k, v in doc.items() if k != 'id'}
+    return UpdateOne(
+        {f: doc[f] for f in PERFORMANCE_KEY_FIELDS},
+        {"$set": fields, "$setOnInsert": {"id": doc["id"]}},
+        upsert=True,
+    )
+
+
+async def write_batch(docs: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Upsert a batch of rows; returns (inserted, modified).
+
+    With bucketed storage the counts are of buckets, not rows.
+    """
+    if not docs:
+        return 0, 0
+    if BUCKETED_STORAGE:
+        result = await db.performance_buckets.bulk_write(performance_bucket_ops(docs), ordered=False)
+    else:
+        result = await db.performance_data.bulk_write([_upsert_op(d) for d in docs], ordered=False)
+    return result.upserted_count, result.modified_count
+
+
+def load_checkpoint(path: Path, resource_id: str) -> int:
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return 0
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return 0
+    if data.get('resource_id') != resource_id:
+        logger.warning(f"Checkpoint {path} is for another resource; starting from 0")
+        return 0
+    return int(data.get('offset', 0))
+
+
+def save_checkpoint(path: Path, resource_id: str, offset: int):
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_text(json.dumps({
+        'resource_id': resource_id,
+        'offset': offset,
+        'updated_at': datetime.now(timezone.utc).isoformat(),
+    }), encoding='utf-8')
+    tmp.replace(path)
+
+
+async def fetch_page(
+    client: httpx.AsyncClient,
+    url: str,
+    offset: int,
+    limit: int,
+    api_key: str,
+    retries: int = 3,
+) -> Dict[str, Any]:
+    params = {'api-key': api_key, 'format': 'json', 'offset': str(offset), 'limit': str(limit)}
+    for attempt in range(retries + 1):
+        try:
+            resp = await client.get(url, params=params)
+            resp.raise_for_status()
+            return resp.json()
+        except (httpx.HTTPError, ValueError) as e:
+            if attempt == retries:
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"Page at offset {offset} failed ({e}); retrying in {delay}s")
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def iter_pages(
+    client: httpx.AsyncClient,
+    url: str,
+    start_offset: int,
+    page_size: int,
+    api_key: str,
+    max_pages: Optional[int] = None,
+) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+    """Yield (offset, records) pages, prefetching the next page while the
+    caller processes the current one."""
+    offset = start_offset
+    pages = 0
+    pending = asyncio.ensure_future(fetch_page(client, url, offset, page_size, api_key))
+    try:
+        while True:
+            payload = await pending
+            records = payload.get('records') or payload.get('data') or []
+            pages += 1
+            total = payload.get('total')
+            last = (
+                len(records) < page_size
+                or (max_pages is not None and pages >= max_pages)
+                or (total is not None and offset + len(records) >= int(total))
+            )
+            if not last:
+                pending = asyncio.ensure_future(
+                    fetch_page(client, url, offset + len(records), page_size, api_key)
+                )
+            if records:
+                yield offset, records
+            if last:
+                return
+            offset += len(records)
+    finally:
+        if not pending.done():
+            pending.cancel()
+
+
+async def run_ingestion(
+    base_url: str = DATA_GOV_BASE_URL,
+    resource_id: str = DATA_GOV_RESOURCE_ID,
+    api_key: str = DATA_GOV_API_KEY,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    checkpoint: Optional[Path] = DEFAULT_CHECKPOINT,
+    resume: bool = False,
+    max_pages: Optional[int] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> Dict[str, int]:
+    """Ingest the resource into performance_data and return run statistics.
+
+    Pass `client` (e.g. one built on httpx.MockTransport) to run against a stub.
+    """
+    url = f"{base_url.rstrip('/')}/resource/{resource_id}"
+    start = load_checkpoint(checkpoint, resource_id) if (resume and checkpoint) else 0
+    stats = {'pages': 0, 'records': 0, 'skipped': 0, 'inserted': 0, 'modified': 0, 'start_offset': start}
+
+    # Rollups group districts by their stored state_code
+    await refresh_district_registry()
+    own_client = client is None
+    if own_client:
+        client = httpx.AsyncClient(timeout=DATA_GOV_TIMEOUT)
+    try:
+        async for offset, records in iter_pages(client, url, start, page_size, api_key, max_pages):
+            docs = parse_page(records, stats)
+            inserted, modified = await write_batch(docs)
+            # Rows may have been overwritten, so recompute the touched rollup
+            # groups from performance_data instead of adding to them
+            state_periods = {(state_code_for_district(d['district_code']), d['year'], d['month']) for d in docs}
+            await recompute_rollups(
+                state_periods=sorted(p for p in state_periods if p[0]),
+                district_years=sorted({(d['district_code'], fiscal_year_of(d['month'], d['year'])) for d in docs}),
+            )
+            stats['pages'] += 1
+            stats['records'] += len(records)
+            stats['inserted'] += inserted
+            stats['modified'] += modified
+            if checkpoint:
+                save_checkpoint(checkpoint, resource_id, offset + len(records))
+            logger.info(
+                f"offset={offset} records={len(records)} inserted={inserted} modified={modified}"
+            )
+    finally:
+        if own_client:
+            await client.aclose()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest the data.gov.in MGNREGA resource into MongoDB")
+    parser.add_argument('--base-url', default=DATA_GOV_BASE_URL, help="API base URL (point at a local stub for testing)")
+    parser.add_argument('--resource-id', default=DATA_GOV_RESOURCE_ID)
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--checkpoint', type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument('--resume', action='store_true', help="continue from the saved checkpoint offset")
+    parser.add_argument('--max-pages', type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    stats = asyncio.run(run_ingestion(
+        base_url=args.base_url,
+        resource_id=args.resource_id,
+        page_size=args.page_size,
+        checkpoint=args.checkpoint,
+        resume=args.resume,
+        max_pages=args.max_pages,
+    ))
+    logger.info(f"Ingestion finished: {stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# Prometheus metrics for the API and its dependencies
+
+import os
+import time
+from typing import Any, Callable, Dict
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import REGISTRY
+from pymongo import monitoring
+
+# Buckets tuned for a cache-fronted API: sub-millisecond hits up to slow upstream calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    multiprocess_mode="livesum",
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by key prefix and result (local_hit, redis_hit, miss)",
+    ["prefix", "result"],
+)
+CACHE_REFRESHES = Counter(
+    "cache_refreshes_total",
+    "Cache entries rebuilt by the background warmer, by key prefix and reason (hot, rollover)",
+    ["prefix", "reason"],
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency",
+    ["collection", "command", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_REQUEST_DURATION = Histogram(
+    "upstream_request_duration_seconds",
+    "data.gov.in request latency",
+    ["outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_REQUESTS_IN_FLIGHT = Gauge(
+    "upstream_requests_in_flight",
+    "data.gov.in requests currently in flight",
+    multiprocess_mode="livesum",
+)
+UPSTREAM_FAILURES = Counter(
+    "upstream_failures_total",
+    "Failed data.gov.in requests by reason",
+    ["reason"],
+)
+UPSTREAM_CIRCUIT_STATE = Gauge(
+    "upstream_circuit_state",
+    "data.gov.in circuit breaker state (1 for the current state)",
+    ["state"],
+    multiprocess_mode="liveall",
+)
+MOCK_FALLBACKS = Counter(
+    "mock_fallbacks_total",
+    "Performance rows served from generated mock data, by reason",
+    ["reason"],
+)
+
+
+def cache_prefix(key: str) -> str:
+    """Metric label for a cache key: its first segment (e.g. history)."""
+    return key.split(":", 1)[0]
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command using the driver's own measurements."""
+
+    def __init__(self):
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self._collections[event.request_id] = collection if isinstance(collection, str) else ""
+
+    def _observe(self, event, outcome: str):
+        collection = self._collections.pop(event.request_id, "")
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name, outcome).observe(
+            event.duration_micros / 1_000_000
+        )
+
+    def succeeded(self, event):
+        self._observe(event, "success")
+
+    def failed(self, event):
+        self._observe(event, "failure")
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware (cheaper than BaseHTTPMiddleware) recording
+    per-route latency and in-flight requests."""
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # The router stores the matched route in the scope; label by its
+            # template so per-district paths do not explode label cardinality
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status[0]),
+            ).observe(time.perf_counter() - started)
+
+
+def render_metrics() -> bytes:
+    """Exposition text for /metrics, aggregating all workers in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
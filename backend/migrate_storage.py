@@ -0,0 +1,132 @@
+"""Copy performance rows between the two storage layouts.
+
+documents: performance_data, one document per (district_code, year, month)
+buckets:   performance_buckets, one document per (district_code, fiscal_year)
+           with the months of that April-March year embedded under `months`
+
+The copy is idempotent (re-running overwrites the same buckets or rows) and
+leaves the source collection untouched. Once it has been verified, set
+PERFORMANCE_STORAGE to the target layout and restart the app; the source can
+be dropped after that.
+
+Usage (from the backend directory):
+    python migrate_storage.py --to buckets              # copy performance_data into buckets
+    python migrate_storage.py --to buckets --state UP   # one state only
+    python migrate_storage.py --to documents            # roll back
+    python migrate_storage.py --verify                  # compare row counts only
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, ReplaceOne
+
+from server import (
+    PERFORMANCE_KEY_FIELDS,
+    db,
+    ensure_indexes,
+    performance_bucket_ops,
+    refresh_district_registry,
+    state_district_filter,
+    with_row_id,
+)
+
+logger = logging.getLogger("migrate_storage")
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _district_filter(state_code: Optional[str]) -> Dict[str, Any]:
+    return {"district_code": state_district_filter(state_code.upper())} if state_code else {}
+
+
+async def to_buckets(state_code: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Copy performance_data rows into buckets; returns the number of rows copied."""
+    copied = 0
+    batch: List[Dict[str, Any]] = []
+    # Walking the unique (district_code, year, month) index keeps each
+    # bucket's months together, so most buckets are written in one update
+    cursor = db.performance_data.find(
+        _district_filter(state_code), {"_id": 0}, batch_size=batch_size
+    ).sort([(f, ASCENDING) for f in PERFORMANCE_KEY_FIELDS])
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await db.performance_buckets.bulk_write(performance_bucket_ops(batch), ordered=False)
+            copied += len(batch)
+            batch = []
+            logger.info(f"{copied} rows copied")
+    if batch:
+        await db.performance_buckets.bulk_write(performance_bucket_ops(batch), ordered=False)
+        copied += len(batch)
+    return copied
+
+
+async def to_documents(state_code: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Copy bucketed rows back into performance_data; returns the number of rows copied."""
+    copied = 0
+    ops = []
+    async for bucket in db.performance_buckets.find(_district_filter(state_code), {"_id": 0, "months": 1}):
+        for entry in bucket.get("months", {}).values():
+            row = with_row_id(entry)
+            ops.append(ReplaceOne({f: row[f] for f in PERFORMANCE_KEY_FIELDS}, row, upsert=True))
+        if len(ops) >= batch_size:
+            await db.performance_data.bulk_write(ops, ordered=False)
+            copied += len(ops)
+            ops = []
+            logger.info(f"{copied} rows copied")
+    if ops:
+        await db.performance_data.bulk_write(ops, ordered=False)
+        copied += len(ops)
+    return copied
+
+
+async def count_rows(state_code: Optional[str] = None) -> Dict[str, int]:
+    """Rows stored in each layout."""
+    documents = await db.performance_data.count_documents(_district_filter(state_code))
+    buckets = 0
+    bucketed_rows = 0
+    async for bucket in db.performance_buckets.find(_district_filter(state_code), {"_id": 0, "months": 1}):
+        buckets += 1
+        bucketed_rows += len(bucket.get("months", {}))
+    return {"documents": documents, "buckets": buckets, "bucketed_rows": bucketed_rows}
+
+
+async def migrate(target: Optional[str], state_code: Optional[str], batch_size: int) -> Dict[str, int]:
+    await ensure_indexes()
+    # --state also matches the state's districts that are not coded with its prefix
+    await refresh_district_registry()
+    if target == "buckets":
+        copied = await to_buckets(state_code, batch_size)
+    elif target == "documents":
+        copied = await to_documents(state_code, batch_size)
+    else:
+        copied = 0
+    return {"copied": copied, **await count_rows(state_code)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy performance rows between storage layouts")
+    parser.add_argument('--to', dest='target', choices=['buckets', 'documents'], default=None,
+                        help="layout to copy into (omit with --verify to only compare counts)")
+    parser.add_argument('--state', default=None, help="only copy this state's districts")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--verify', action='store_true', help="compare row counts in both layouts")
+    args = parser.parse_args()
+    if args.target is None and not args.verify:
+        parser.error("pass --to buckets|documents or --verify")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    started = time.perf_counter()
+    stats = asyncio.run(migrate(args.target, args.state, args.batch_size))
+    logger.info(f"{stats} in {time.perf_counter() - started:.1f}s")
+    if stats["documents"] != stats["bucketed_rows"]:
+        logger.warning("Row counts differ between the layouts")
+        if args.verify:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Precomputed district rankings within a state.
+
+A RankTable holds, for one (state, month) and each ranked metric, the
+districts' values in ascending order, so a district's rank and percentile
+are two binary searches instead of a query over the whole state. RankEngine
+keeps recently used tables together with a signature of the data they were
+built from; the app rebuilds a table when that signature changes (see
+server.rank_table).
+"""
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Headline metrics ranked for every district; higher is better for each
+RANKED_METRICS = ("total_workers", "person_days_generated", "budget_utilization", "average_wage")
+
+
+def budget_utilization(row: Dict[str, Any]) -> float:
+    """Budget utilization in percent; 0 when nothing was allocated."""
+    allocated = row.get("budget_allocated") or 0
+    return (row.get("budget_spent") or 0) / allocated * 100 if allocated > 0 else 0.0
+
+
+def metric_value(row: Dict[str, Any], metric: str) -> float:
+    if metric == "budget_utilization":
+        return budget_utilization(row)
+    return row.get(metric) or 0
+
+
+class RankTable:
+    """Sorted metric values of one state's districts for one month."""
+
+    def __init__(self, rows: Iterable[Dict[str, Any]], metrics: Sequence[str] = RANKED_METRICS):
+        self.values: Dict[str, Dict[str, float]] = {}
+        for row in rows:
+            self.values[row["district_code"]] = {m: metric_value(row, m) for m in metrics}
+        self.sorted: Dict[str, List[float]] = {
+            m: sorted(v[m] for v in self.values.values()) for m in metrics
+        }
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def rank(self, district_code: str, metric: str) -> Optional[Dict[str, Any]]:
+        """Rank (1 = highest, ties share the best rank) and percentile of a
+        district. The percentile is the share of other districts below it,
+        counting ties as half below: 0 for the lowest, 100 for the highest."""
+        value = self.values.get(district_code, {}).get(metric)
+        if value is None:
+            return None
+        ordered = self.sorted[metric]
+        n = len(ordered)
+        below = bisect_left(ordered, value)
+        ties = bisect_right(ordered, value) - below
+        return {
+            "value": value,
+            "rank": n - below - ties + 1,
+            "of": n,
+            "percentile": round((below + (ties - 1) / 2) / (n - 1) * 100, 1) if n > 1 else 100.0,
+        }
+
+    def ranks(self, district_code: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        if district_code not in self.values:
+            return None
+        return {m: self.rank(district_code, m) for m in self.sorted}
+
+
+Key = Tuple[str, int, int]
+
+
+class RankEngine:
+    """Bounded LRU of RankTables keyed by (state_code, year, month), like the
+    state_monthly_rollups documents whose contents serve as signatures."""
+
+    def __init__(self, max_tables: int, check_interval: float):
+        self.max_tables = max_tables
+        self.check_interval = check_interval
+        # key -> (signature, last checked (monotonic), table)
+        self._tables: "OrderedDict[Key, Tuple[Any, float, RankTable]]" = OrderedDict()
+
+    def get(self, key: Key) -> Optional[Tuple[Any, float, RankTable]]:
+        entry = self._tables.get(key)
+        if entry is not None:
+            self._tables.move_to_end(key)
+        return entry
+
+    def fresh(self, key: Key) -> Optional[RankTable]:
+        """The table for `key` if its signature was confirmed recently."""
+        entry = self.get(key)
+        if entry is None or time.monotonic() - entry[1] >= self.check_interval:
+            return None
+        return entry[2]
+
+    def put(self, key: Key, signature: Any, table: RankTable):
+        self._tables[key] = (signature, time.monotonic(), table)
+        self._tables.move_to_end(key)
+        while len(self._tables) > self.max_tables:
+            self._tables.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[Key]):
+        for key in keys:
+            self._tables.pop(key, None)
+
+    def clear(self):
+        self._tables.clear()
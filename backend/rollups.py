@@ -0,0 +1,62 @@
+"""Rebuild the precomputed rollup collections from the stored performance rows.
+
+The app keeps `state_monthly_rollups` and `district_fy_totals` up to date as
+rows are written; run this after a backfill, a manual data fix or when the
+rollups were introduced on an existing database.
+
+Usage (from the backend directory):
+    python rollups.py                 # rebuild everything
+    python rollups.py --state UP      # rebuild one state's rollups
+"""
+import argparse
+import asyncio
+import logging
+
+from server import (
+    db,
+    fiscal_year_of,
+    iter_performance_rows,
+    recompute_rollups,
+    refresh_district_registry,
+    state_code_for_district,
+    state_district_filter,
+)
+
+logger = logging.getLogger("rollups")
+
+
+async def rebuild(state_code: str = None):
+    # States are resolved through the stored districts, not just code prefixes
+    await refresh_district_registry()
+    if state_code is None:
+        # Start from scratch so groups without rows do not linger
+        await db.state_monthly_rollups.delete_many({})
+        await db.district_fy_totals.delete_many({})
+        return await recompute_rollups()
+
+    state_code = state_code.upper()
+    state_periods = set()
+    district_years = set()
+    async for doc in iter_performance_rows(
+        {"district_code": state_district_filter(state_code)},
+        {"_id": 0, "district_code": 1, "month": 1, "year": 1},
+    ):
+        state_periods.add((state_code_for_district(doc["district_code"]), doc["year"], doc["month"]))
+        district_years.add((doc["district_code"], fiscal_year_of(doc["month"], doc["year"])))
+    await db.state_monthly_rollups.delete_many({"state_code": state_code})
+    await db.district_fy_totals.delete_many({"state_code": state_code})
+    return await recompute_rollups(sorted(state_periods), sorted(district_years))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild MGNREGA rollup collections")
+    parser.add_argument('--state', default=None, help="only rebuild this state's rollups")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    states, districts = asyncio.run(rebuild(args.state))
+    logger.info(f"Rebuilt {states} state-month rollups and {districts} district fiscal-year totals")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,58 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 import os
+import asyncio
+import hashlib
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Callable, Awaitable, Iterable, AsyncIterator
 import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 import httpx
 import redis.asyncio as redis
+import csv
+import io
 import json
+import orjson
+import re
+import time
+from collections import OrderedDict
 from urllib.parse import quote_plus
 from contextlib import asynccontextmanager
-from states_data import get_all_states, get_districts_for_state, INDIAN_STATES
+from functools import partial
+from states_data import get_all_states, INDIAN_STATES
+from district_registry import DistrictRegistry, district_entry, load_seed_districts, seed_entries
+from ranking import RankEngine, RankTable
+from synthetic_data import ID_NAMESPACE, mock_performance_values
+from metrics import (
+    CACHE_REFRESHES,
+    CACHE_REQUESTS,
+    CONTENT_TYPE_LATEST,
+    MOCK_FALLBACKS,
+    UPSTREAM_CIRCUIT_STATE,
+    UPSTREAM_FAILURES,
+    UPSTREAM_REQUEST_DURATION,
+    UPSTREAM_REQUESTS_IN_FLIGHT,
+    MetricsMiddleware,
+    MongoCommandMetrics,
+    cache_prefix,
+    render_metrics,
+)
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Serve reads from a columnar snapshot directory (build_snapshot.py) instead
+# of MongoDB; nothing is written back in this mode
+PERFORMANCE_SNAPSHOT = os.environ.get('PERFORMANCE_SNAPSHOT', '').strip()
+
 # MongoDB connection (robust env handling)
 # Support common var names and provide a clear error if missing
 mongo_url = (
@@ -26,6 +60,9 @@ mongo_url = (
     or os.environ.get('MONGODB_URI')
     or os.environ.get('MONGO_URI')
 )
+if not mongo_url and PERFORMANCE_SNAPSHOT:
+    # The client is created but never contacted
+    mongo_url = 'mongodb://localhost:27017'
 if not mongo_url:
     raise RuntimeError(
         "Missing MongoDB connection string. Set MONGO_URL (or MONGODB_URI/MONGO_URI) in your environment."
@@ -49,9 +86,18 @@ if '://' in mongo_url and '@' in mongo_url:
         logging.warning(f"Could not auto-encode MongoDB credentials: {e}. Using URL as-is.")
 
 db_name = os.environ.get('DB_NAME', 'mgnrega')
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandMetrics()])
 db = client[db_name]
 
+# Storage layout for performance rows: "documents" keeps one performance_data
+# document per district and month; "buckets" keeps one performance_buckets
+# document per district and fiscal year (migrate with migrate_storage.py)
+PERFORMANCE_STORAGE = os.environ.get('PERFORMANCE_STORAGE', 'documents').strip().lower()
+BUCKETED_STORAGE = PERFORMANCE_STORAGE == 'buckets'
+
+# Seed district metadata at startup: comma-separated state codes, or "all"
+SEED_DISTRICTS = os.environ.get('SEED_DISTRICTS', '').strip()
+
 # Redis connection
 redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379')
 redis_client = None
@@ -59,7 +105,74 @@ redis_client = None
 # data.gov.in configuration
 DATA_GOV_API_KEY = os.environ.get('DATA_GOV_API_KEY', '579b464db66ec23bdd000001c5f7ea9da0054f1442874f7b61f02d14')
 DATA_GOV_RESOURCE_ID = os.environ.get('DATA_GOV_RESOURCE_ID', 'ee03643a-ee4c-48c2-ac30-9f2ff26ab722')
+DATA_GOV_BASE_URL = os.environ.get('DATA_GOV_BASE_URL', 'https://api.data.gov.in').rstrip('/')
 USE_DATA_GOV = os.environ.get('USE_DATA_GOV', '0').strip() in {'1', 'true', 'yes', 'on'}
+DATA_GOV_TIMEOUT = float(os.environ.get('DATA_GOV_TIMEOUT', '8.0'))
+DATA_GOV_MAX_CONNECTIONS = int(os.environ.get('DATA_GOV_MAX_CONNECTIONS', '20'))
+DATA_GOV_MAX_CONCURRENCY = int(os.environ.get('DATA_GOV_MAX_CONCURRENCY', '10'))
+# Circuit breaker: open after this many consecutive failures, probe again after
+# DATA_GOV_BREAKER_RESET seconds. Empty lookups are remembered for DATA_GOV_MISSING_TTL.
+DATA_GOV_BREAKER_THRESHOLD = int(os.environ.get('DATA_GOV_BREAKER_THRESHOLD', '5'))
+DATA_GOV_BREAKER_RESET = float(os.environ.get('DATA_GOV_BREAKER_RESET', '30'))
+DATA_GOV_MISSING_TTL = int(os.environ.get('DATA_GOV_MISSING_TTL', '21600'))
+DATA_GOV_HTTP2 = os.environ.get('DATA_GOV_HTTP2', '0').strip() in {'1', 'true', 'yes', 'on'}
+
+# Cache stampede protection: a short Redis lock lets one worker recompute an
+# expired key while the others wait for it or serve the stale copy
+CACHE_LOCK_TTL = float(os.environ.get('CACHE_LOCK_TTL', '10'))
+CACHE_LOCK_WAIT = float(os.environ.get('CACHE_LOCK_WAIT', '3'))
+CACHE_STALE_TTL = int(os.environ.get('CACHE_STALE_TTL', '3600'))
+# Prefix for every Redis cache key; cached values are serialized response bodies
+CACHE_NAMESPACE = os.environ.get('CACHE_NAMESPACE', 'v2')
+# Cache lifetime (seconds) of responses built from one month's rows, which
+# keep changing while that month is current
+CURRENT_MONTH_TTL = 3600
+# Responses smaller than this (bytes) are sent uncompressed
+GZIP_MINIMUM_SIZE = 1000
+
+# In-process L1 cache in front of Redis. Entries live at most L1_CACHE_MAX_TTL
+# seconds so a missed invalidation message cannot keep a worker stale for long.
+L1_CACHE_MAX_BYTES = int(os.environ.get('L1_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+L1_CACHE_MAX_TTL = float(os.environ.get('L1_CACHE_MAX_TTL', '300'))
+CACHE_INVALIDATION_CHANNEL = os.environ.get('CACHE_INVALIDATION_CHANNEL', 'cache:invalidate')
+WORKER_ID = uuid.uuid4().hex
+# Most districts one /api/performance?codes=... request may ask for
+PERFORMANCE_BATCH_MAX = int(os.environ.get('PERFORMANCE_BATCH_MAX', '250'))
+# Per-worker district rank tables: how many (state, month) tables to keep and
+# how often (seconds) a table is checked against its state's monthly rollup
+RANK_MAX_TABLES = int(os.environ.get('RANK_MAX_TABLES', '512'))
+RANK_CHECK_INTERVAL = float(os.environ.get('RANK_CHECK_INTERVAL', '30'))
+
+# Refresh-ahead cache warming. Keys requested at least CACHE_WARM_MIN_HITS
+# times within CACHE_WARM_WINDOW seconds are rebuilt once less than
+# CACHE_WARM_REFRESH_AHEAD seconds of their TTL remain. At month rollover the
+# new month's performance and history entries are built for every district.
+CACHE_WARM_ENABLED = os.environ.get('CACHE_WARM_ENABLED', '1').strip() in {'1', 'true', 'yes', 'on'}
+CACHE_WARM_INTERVAL = float(os.environ.get('CACHE_WARM_INTERVAL', '30'))
+CACHE_WARM_REFRESH_AHEAD = float(os.environ.get('CACHE_WARM_REFRESH_AHEAD', '120'))
+CACHE_WARM_MIN_HITS = int(os.environ.get('CACHE_WARM_MIN_HITS', '2'))
+CACHE_WARM_WINDOW = float(os.environ.get('CACHE_WARM_WINDOW', '3600'))
+CACHE_WARM_MAX_KEYS = int(os.environ.get('CACHE_WARM_MAX_KEYS', '10000'))
+CACHE_WARM_CONCURRENCY = int(os.environ.get('CACHE_WARM_CONCURRENCY', '8'))
+CACHE_WARM_HISTORY_MONTHS = [
+    int(m) for m in os.environ.get('CACHE_WARM_HISTORY_MONTHS', '6').split(',') if m.strip()
+]
+
+# Loaded at startup when PERFORMANCE_SNAPSHOT is set
+snapshot = None
+
+# District metadata for lookups and search; seed data until startup merges
+# in the stored districts (refresh_district_registry)
+district_registry = DistrictRegistry(seed_entries())
+
+def load_snapshot(directory: str):
+    """Open a snapshot directory; pyarrow is only imported in snapshot mode."""
+    from snapshot import PerformanceSnapshot
+    return PerformanceSnapshot(Path(directory))
+
+# Shared upstream HTTP client (created lazily, closed on shutdown)
+http_client: Optional[httpx.AsyncClient] = None
+upstream_semaphore = asyncio.Semaphore(DATA_GOV_MAX_CONCURRENCY)
 
 # Lifespan context manager for startup/shutdown
 @asynccontextmanager
@@ -67,10 +180,32 @@ async def lifespan(app: FastAPI):
     # Startup
     logger = logging.getLogger(__name__)
     logger.info("Starting MGNREGA Dashboard API")
+    global snapshot
+    if PERFORMANCE_SNAPSHOT:
+        snapshot = load_snapshot(PERFORMANCE_SNAPSHOT)
+        logger.info(f"Serving reads from snapshot {PERFORMANCE_SNAPSHOT} ({snapshot.num_rows} rows, "
+                    f"built {snapshot.manifest.get('built_at', 'unknown')})")
+    else:
+        await ensure_indexes()
     await get_redis()
+    get_http_client()
+    if SEED_DISTRICTS and snapshot is None:
+        seeded = await seed_default_districts(
+            None if SEED_DISTRICTS.lower() == "all" else SEED_DISTRICTS.split(",")
+        )
+        logger.info(f"Seeded {len(seeded)} districts")
+    await refresh_district_registry()
+    logger.info(f"District registry holds {len(district_registry)} districts")
+    invalidation_task = asyncio.create_task(listen_for_invalidations())
+    warmer_task = asyncio.create_task(run_cache_warmer()) if CACHE_WARM_ENABLED else None
     yield
     # Shutdown
+    invalidation_task.cancel()
+    if warmer_task:
+        warmer_task.cancel()
     client.close()
+    if http_client:
+        await http_client.aclose()
     if redis_client:
         await redis_client.close()
 
@@ -110,6 +245,23 @@ class DistrictResponse(BaseModel):
     success: bool
     data: List[District]
 
+class NearestDistrict(District):
+    distance_km: float
+
+class NearestDistrictsResponse(BaseModel):
+    success: bool
+    data: List[NearestDistrict]
+
+class State(BaseModel):
+    code: str
+    name: str
+    name_hi: str
+    district_count: int = 0
+
+class StatesResponse(BaseModel):
+    success: bool
+    data: List[State]
+
 class PerformanceResponse(BaseModel):
     success: bool
     data: Optional[PerformanceData] = None
@@ -122,45 +274,1033 @@ class ComparisonResponse(BaseModel):
     success: bool
     data: Dict[str, Any]
 
+class StateSummaryResponse(BaseModel):
+    success: bool
+    data: Dict[str, Any]
+
+class StateRankingsResponse(BaseModel):
+    success: bool
+    data: Dict[str, Any]
+
+class DistrictRankResponse(BaseModel):
+    success: bool
+    data: Dict[str, Any]
+
+class FiscalYearResponse(BaseModel):
+    success: bool
+    data: Dict[str, Any]
+
+class BatchPerformanceResponse(BaseModel):
+    success: bool
+    month: int
+    year: int
+    data: Dict[str, PerformanceData]
+
+class DashboardData(BaseModel):
+    current: PerformanceData
+    history: List[PerformanceData]
+    comparison: Dict[str, Any]
+
+class DashboardResponse(BaseModel):
+    success: bool
+    data: DashboardData
+
 # Helper Functions
+PERFORMANCE_KEY_FIELDS = ("district_code", "year", "month")
+SUMMED_METRICS = (
+    "total_workers", "work_completed", "work_ongoing",
+    "budget_allocated", "budget_spent", "person_days_generated",
+)
+
+def _bucket_entry(doc: Dict[str, Any]) -> Dict[str, Any]:
+    # Month entries are rows without their id; ids are derived on read (with_row_id)
+    return {k: v for k, v in doc.items() if k != "id"}
+
+def performance_bucket_op(doc: Dict[str, Any]) -> UpdateOne:
+    """Add one performance row to its district/fiscal-year bucket, leaving an
+    existing entry for that month untouched."""
+    month = doc["month"]
+    return UpdateOne(
+        {
+            "district_code": doc["district_code"],
+            "fiscal_year": fiscal_year_of(month, doc["year"]),
+            f"months.{month}": {"$exists": False},
+        },
+        {
+            "$set": {f"months.{month}": _bucket_entry(doc)},
+            "$setOnInsert": {"state_code": state_code_for_district(doc["district_code"])},
+        },
+        upsert=True
+    )
+
+def performance_bucket_ops(docs: Iterable[Dict[str, Any]]) -> List[UpdateOne]:
+    """Write (and overwrite) many rows into their buckets, one update per bucket."""
+    buckets: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    for doc in docs:
+        key = (doc["district_code"], fiscal_year_of(doc["month"], doc["year"]))
+        buckets.setdefault(key, {})[f"months.{doc['month']}"] = _bucket_entry(doc)
+    return [
+        UpdateOne(
+            {"district_code": d, "fiscal_year": fy},
+            {"$set": months, "$setOnInsert": {"state_code": state_code_for_district(d)}},
+            upsert=True
+        )
+        for (d, fy), months in buckets.items()
+    ]
+
+def with_row_id(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Give a bucketed row the stable id it is served with."""
+    row_id = str(uuid.uuid5(ID_NAMESPACE, f"{row['district_code']}:{row['year']}:{row['month']}"))
+    return {"id": row_id, **{k: v for k, v in row.items() if k != "id"}}
+
+def new_performance_row(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Validated row for freshly fetched data, with the id it will be read back with."""
+    row = PerformanceData(**data).model_dump()
+    return with_row_id(row) if BUCKETED_STORAGE else row
+
+def _bucket_match(query: Dict[str, Any]) -> Dict[str, Any]:
+    """Bucket filter covering every bucket a performance row query can match."""
+    match: Dict[str, Any] = {}
+    if "district_code" in query:
+        match["district_code"] = query["district_code"]
+    if isinstance(query.get("month"), int) and isinstance(query.get("year"), int):
+        match["fiscal_year"] = fiscal_year_of(query["month"], query["year"])
+    clauses = query.get("$or")
+    if clauses:
+        if all(isinstance(c.get("month"), int) and isinstance(c.get("year"), int) for c in clauses):
+            match["fiscal_year"] = {"$in": sorted({fiscal_year_of(c["month"], c["year"]) for c in clauses})}
+        elif "district_code" not in query and all("district_code" in c for c in clauses):
+            match["$or"] = [_bucket_match(c) for c in clauses]
+    return match
+
+def performance_source(query: Dict[str, Any]) -> Tuple[Any, List[Dict[str, Any]]]:
+    """Collection and leading aggregation stages that yield the performance
+    rows matching `query` in the configured storage layout."""
+    if not BUCKETED_STORAGE:
+        return db.performance_data, [{"$match": query}]
+    return db.performance_buckets, [
+        {"$match": _bucket_match(query)},
+        {"$project": {"_id": 0, "rows": {"$objectToArray": "$months"}}},
+        {"$unwind": "$rows"},
+        {"$replaceRoot": {"newRoot": "$rows.v"}},
+        {"$match": query},
+    ]
+
+async def iter_performance_rows(
+    query: Dict[str, Any],
+    projection: Optional[Dict[str, Any]] = None,
+    sort: bool = False,
+    batch_size: int = 1000,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Performance rows matching `query`, in PerformanceData shape, from
+    either storage layout. Without a projection rows include their id.
+
+    With `sort`, rows come ordered by district_code, year and month.
+    """
+    if not BUCKETED_STORAGE:
+        cursor = db.performance_data.find(query, projection or {"_id": 0}, batch_size=batch_size)
+        if sort:
+            cursor = cursor.sort([(f, ASCENDING) for f in PERFORMANCE_KEY_FIELDS])
+        async for doc in cursor:
+            yield doc
+        return
+    collection, stages = performance_source(query)
+    if sort:
+        stages.append({"$sort": {f: 1 for f in PERFORMANCE_KEY_FIELDS}})
+    if projection:
+        stages.append({"$project": projection})
+    async for row in collection.aggregate(stages, allowDiskUse=True, batchSize=batch_size):
+        yield row if projection else with_row_id(row)
+
+async def ensure_indexes():
+    """Create the indexes the read and lazy-fill paths rely on."""
+    perf_keys = [(f, ASCENDING) for f in PERFORMANCE_KEY_FIELDS]
+    try:
+        try:
+            await db.performance_data.create_index(perf_keys, unique=True, name="district_period_unique")
+        except OperationFailure as e:
+            if e.code != 11000:
+                raise
+            # Older deployments could insert the same month twice. Deleting rows
+            # is left to an explicit run of dedupe_performance.py
+            logging.error(
+                "performance_data has duplicate (district_code, year, month) rows; "
+                "run dedupe_performance.py. Continuing without the unique index."
+            )
+        await db.districts.create_index([("district_code", ASCENDING)], name="district_code")
+        await db.performance_buckets.create_index(
+            [("district_code", ASCENDING), ("fiscal_year", ASCENDING)],
+            unique=True, name="district_fy_unique"
+        )
+        await db.state_monthly_rollups.create_index(
+            [("state_code", ASCENDING), ("year", ASCENDING), ("month", ASCENDING)],
+            unique=True, name="state_period_unique"
+        )
+        await db.district_fy_totals.create_index(
+            [("district_code", ASCENDING), ("fiscal_year", ASCENDING)],
+            unique=True, name="district_fy_unique"
+        )
+        await db.districts.create_index(
+            [("state_code", ASCENDING), ("district_name", ASCENDING)], name="state_district_name"
+        )
+    except Exception as e:
+        logging.error(f"Index creation failed: {e}")
+
+async def upsert_performance_rows(docs: List[Dict[str, Any]]):
+    """Idempotently store performance rows keyed by (district_code, year, month).
+
+    Existing rows are left untouched, so concurrent lazy fills of the same
+    month converge on a single document.
+    """
+    if not docs:
+        return
+    if BUCKETED_STORAGE:
+        inserted = await _insert_bucket_months(docs)
+    else:
+        ops = [
+            UpdateOne(
+                {f: d[f] for f in PERFORMANCE_KEY_FIELDS},
+                {"$setOnInsert": d},
+                upsert=True
+            )
+            for d in docs
+        ]
+        try:
+            result = await db.performance_data.bulk_write(ops, ordered=False)
+            inserted = list(result.upserted_ids)
+        except BulkWriteError as e:
+            # Two concurrent upserts of the same key may race on the unique index;
+            # the loser's row already exists, which is all we need.
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+            inserted = [u["index"] for u in e.details.get("upserted", [])]
+    # Only the writer that actually inserted a row counts it in the rollups
+    await increment_rollups([docs[i] for i in inserted])
+
+async def _insert_bucket_months(docs: List[Dict[str, Any]]) -> List[int]:
+    """Bucketed upsert_performance_rows; returns the indexes of rows written.
+
+    A duplicate key error means either the month already exists or another
+    writer created the bucket first; the second case is retried once, now
+    that the bucket exists.
+    """
+    pending = list(range(len(docs)))
+    written: List[int] = []
+    for attempt in range(2):
+        try:
+            await db.performance_buckets.bulk_write(
+                [performance_bucket_op(docs[i]) for i in pending], ordered=False
+            )
+            failed: List[int] = []
+        except BulkWriteError as e:
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+            failed = [pending[err["index"]] for err in e.details.get("writeErrors", [])]
+        failed_set = set(failed)
+        written.extend(i for i in pending if i not in failed_set)
+        if not failed:
+            break
+        pending = failed
+    return written
+
+def state_code_for_district(district_code: str) -> str:
+    """State of a district: its state_code in the district registry, else the
+    code's state prefix, e.g. UP for UP01 ("" if there is neither)."""
+    entry = district_registry.get(str(district_code))
+    if entry and entry["state_code"]:
+        return entry["state_code"]
+    match = re.match(r"[A-Z]+", str(district_code).upper())
+    return match.group(0) if match else ""
+
+def fiscal_year_of(month: int, year: int) -> int:
+    """Starting calendar year of the April-March fiscal year containing the month."""
+    return year if month >= 4 else year - 1
+
+def _rollup_keys(doc: Dict[str, Any]) -> Tuple[Tuple[str, int, int], Tuple[str, int]]:
+    state = state_code_for_district(doc["district_code"])
+    return (state, doc["year"], doc["month"]), (doc["district_code"], fiscal_year_of(doc["month"], doc["year"]))
+
+async def increment_rollups(docs: List[Dict[str, Any]]):
+    """Add newly inserted performance rows to the monthly state rollups and the
+    per-district fiscal-year totals."""
+    state_incs: Dict[Tuple[str, int, int], Dict[str, float]] = {}
+    district_incs: Dict[Tuple[str, int], Dict[str, float]] = {}
+    skipped = 0
+    for doc in docs:
+        state_key, district_key = _rollup_keys(doc)
+        deltas = {f"totals.{m}": doc.get(m, 0) for m in SUMMED_METRICS}
+        deltas["average_wage_sum"] = doc.get("average_wage", 0)
+        for target, key, counter in (
+            (state_incs, state_key, "districts_reporting"),
+            (district_incs, district_key, "months_reporting"),
+        ):
+            if not key[0]:
+                skipped += 1
+                continue
+            acc = target.setdefault(key, {counter: 0})
+            acc[counter] += 1
+            for field, value in deltas.items():
+                acc[field] = acc.get(field, 0) + value
+
+    try:
+        if state_incs:
+            await db.state_monthly_rollups.bulk_write([
+                UpdateOne({"state_code": s, "year": y, "month": m}, {"$inc": inc}, upsert=True)
+                for (s, y, m), inc in state_incs.items()
+            ], ordered=False)
+        if district_incs:
+            await db.district_fy_totals.bulk_write([
+                UpdateOne(
+                    {"district_code": d, "fiscal_year": fy},
+                    {"$inc": inc, "$setOnInsert": {"state_code": state_code_for_district(d)}},
+                    upsert=True
+                )
+                for (d, fy), inc in district_incs.items()
+            ], ordered=False)
+        if skipped:
+            logging.warning(f"Left {skipped} rows of districts with no known state out of the state rollups")
+    except Exception as e:
+        # Rollups can always be rebuilt from performance_data (python rollups.py [--state XX])
+        logging.error(f"Rollup increment failed: {e}")
+    # Other workers notice through the rollup signature (rank_table)
+    rank_engine.invalidate(state_incs)
+
+async def recompute_rollups(
+    state_periods: Optional[List[Tuple[str, int, int]]] = None,
+    district_years: Optional[List[Tuple[str, int]]] = None,
+) -> Tuple[int, int]:
+    """Rebuild rollup documents from the stored performance rows.
+
+    With no arguments every rollup is rebuilt; otherwise only the given
+    (state, year, month) and (district, fiscal_year) groups are recomputed.
+    Returns the number of state and district documents written.
+    """
+    rows_query: Dict[str, Any] = {}
+    if state_periods is not None or district_years is not None:
+        clauses = [
+            {"district_code": state_district_filter(s), "year": y, "month": m}
+            for s, y, m in (state_periods or [])
+        ] + [
+            {"district_code": d, "$or": [
+                {"year": fy, "month": {"$gte": 4}},
+                {"year": fy + 1, "month": {"$lte": 3}},
+            ]}
+            for d, fy in (district_years or [])
+        ]
+        if not clauses:
+            return 0, 0
+        rows_query = {"$or": clauses}
+
+    wanted_states = set(state_periods) if state_periods is not None else None
+    wanted_districts = set(district_years) if district_years is not None else None
+    state_docs: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+    district_docs: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    if wanted_states:
+        # Groups that no longer have any rows are reset to zero
+        for key in wanted_states:
+            state_docs[key] = {"districts_reporting": 0, "average_wage_sum": 0, "totals": {m: 0 for m in SUMMED_METRICS}}
+    if wanted_districts:
+        for key in wanted_districts:
+            district_docs[key] = {"months_reporting": 0, "average_wage_sum": 0, "totals": {m: 0 for m in SUMMED_METRICS}}
+
+    projection = {"_id": 0, "average_wage": 1, **{f: 1 for f in PERFORMANCE_KEY_FIELDS}, **{m: 1 for m in SUMMED_METRICS}}
+    skipped = 0
+    async for doc in iter_performance_rows(rows_query, projection):
+        state_key, district_key = _rollup_keys(doc)
+        skipped += not state_key[0]
+        for target, key, wanted, counter in (
+            (state_docs, state_key, wanted_states, "districts_reporting"),
+            (district_docs, district_key, wanted_districts, "months_reporting"),
+        ):
+            if not key[0] or (wanted is not None and key not in wanted):
+                continue
+            acc = target.setdefault(key, {counter: 0, "average_wage_sum": 0, "totals": {m: 0 for m in SUMMED_METRICS}})
+            acc[counter] += 1
+            acc["average_wage_sum"] += doc.get("average_wage", 0)
+            for m in SUMMED_METRICS:
+                acc["totals"][m] += doc.get(m, 0)
+
+    if state_docs:
+        await db.state_monthly_rollups.bulk_write([
+            ReplaceOne({"state_code": s, "year": y, "month": m}, {"state_code": s, "year": y, "month": m, **acc}, upsert=True)
+            for (s, y, m), acc in state_docs.items()
+        ], ordered=False)
+    if district_docs:
+        await db.district_fy_totals.bulk_write([
+            ReplaceOne(
+                {"district_code": d, "fiscal_year": fy},
+                {"district_code": d, "state_code": state_code_for_district(d), "fiscal_year": fy, **acc},
+                upsert=True
+            )
+            for (d, fy), acc in district_docs.items()
+        ], ordered=False)
+    if skipped:
+        logging.warning(f"Left {skipped} rows of districts with no known state out of the state rollups")
+    return len(state_docs), len(district_docs)
+
 async def get_redis():
     global redis_client
     if redis_client is None:
         try:
-            redis_client = await redis.from_url(redis_url, decode_responses=True)
+            # Cached values are pre-serialized response bodies; keep them as bytes
+            redis_client = await redis.from_url(redis_url, decode_responses=False)
         except Exception as e:
             logging.warning(f"Redis connection failed: {e}. Continuing without cache.")
     return redis_client
 
-async def cache_get(key: str) -> Optional[Any]:
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client used for data.gov.in requests."""
+    global http_client
+    if http_client is None:
+        http2 = DATA_GOV_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logging.warning("DATA_GOV_HTTP2 is set but the h2 package is missing. Using HTTP/1.1.")
+                http2 = False
+        http_client = httpx.AsyncClient(
+            timeout=DATA_GOV_TIMEOUT,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=DATA_GOV_MAX_CONNECTIONS,
+                max_keepalive_connections=DATA_GOV_MAX_CONNECTIONS,
+            ),
+        )
+    return http_client
+
+def redis_key(key: str) -> str:
+    """Namespaced Redis key; bump CACHE_NAMESPACE when the payload format changes."""
+    return f"{CACHE_NAMESPACE}:{key}"
+
+class LocalCache:
+    """Bounded in-process TTL cache with LRU eviction by payload size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        # key -> (expires_at, size, value, origin_expires_at); ordered from least
+        # to most recently used. origin_expires_at is when the Redis copy expires
+        self._entries: "OrderedDict[str, Tuple[float, int, Any, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def set(self, key: str, value: Any, size: int, ttl: float, origin_ttl: Optional[float] = None):
+        self.delete(key)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        now = time.monotonic()
+        self._entries[key] = (now + ttl, size, value, now + (ttl if origin_ttl is None else origin_ttl))
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted_size, _, _) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def ttl(self, key: str) -> Optional[float]:
+        """Seconds until `key` expires, or None if it is not cached."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        remaining = entry[0] - time.monotonic()
+        return remaining if remaining > 0 else None
+
+    def origin_ttl(self, key: str) -> Optional[float]:
+        """Seconds until the Redis copy of `key` expires, or None if `key` is
+        not cached here."""
+        if self.ttl(key) is None:
+            return None
+        return max(self._entries[key][3] - time.monotonic(), 0.0)
+
+    def delete(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+local_cache = LocalCache(L1_CACHE_MAX_BYTES)
+
+async def cache_get(key: str, local: bool = True) -> Optional[bytes]:
+    """Return the cached payload bytes for `key`, or None on a miss.
+
+    With local=False the in-process cache is neither read nor filled.
+    """
+    prefix = cache_prefix(key)
+    value = local_cache.get(key) if local else None
+    if value is not None:
+        CACHE_REQUESTS.labels(prefix, "local_hit").inc()
+        return value
     try:
         r = await get_redis()
         if r:
-            value = await r.get(key)
-            return json.loads(value) if value else None
+            async with r.pipeline(transaction=False) as pipe:
+                pipe.get(redis_key(key))
+                pipe.pttl(redis_key(key))
+                payload, pttl = await pipe.execute()
+            if payload:
+                if local and pttl and pttl > 0:
+                    local_cache.set(key, payload, len(payload), min(pttl / 1000, L1_CACHE_MAX_TTL), pttl / 1000)
+                CACHE_REQUESTS.labels(prefix, "redis_hit").inc()
+                return payload
     except Exception as e:
         logging.error(f"Cache get error: {e}")
+    CACHE_REQUESTS.labels(prefix, "miss").inc()
     return None
 
-async def cache_set(key: str, value: Any, ttl: int = 3600):
+async def cache_get_many(keys: List[str]) -> List[Optional[bytes]]:
+    """cache_get for many keys: local hits first, then one Redis MGET."""
+    values: List[Optional[bytes]] = [local_cache.get(key) for key in keys]
+    pending = [i for i, value in enumerate(values) if value is None]
+    for key, value in zip(keys, values):
+        if value is not None:
+            CACHE_REQUESTS.labels(cache_prefix(key), "local_hit").inc()
     try:
         r = await get_redis()
-        if r:
-            await r.setex(key, ttl, json.dumps(value, default=str))
+        if r and pending:
+            names = [redis_key(keys[i]) for i in pending]
+            async with r.pipeline(transaction=False) as pipe:
+                pipe.mget(names)
+                for name in names:
+                    pipe.pttl(name)
+                payloads, *pttls = await pipe.execute()
+            for i, payload, pttl in zip(pending, payloads, pttls):
+                if payload:
+                    if pttl and pttl > 0:
+                        local_cache.set(keys[i], payload, len(payload), min(pttl / 1000, L1_CACHE_MAX_TTL), pttl / 1000)
+                    CACHE_REQUESTS.labels(cache_prefix(keys[i]), "redis_hit").inc()
+                    values[i] = payload
+    except Exception as e:
+        logging.error(f"Cache get error: {e}")
+    for i in pending:
+        if values[i] is None:
+            CACHE_REQUESTS.labels(cache_prefix(keys[i]), "miss").inc()
+    return values
+
+async def cache_set(key: str, payload: bytes, ttl: int = 3600, stale: bool = True):
+    await cache_set_many({key: payload}, ttl, stale)
+
+async def cache_set_many(items: Dict[str, bytes], ttl: int = 3600, stale: bool = True):
+    """Store several payloads with the same TTL in one Redis round trip."""
+    for key, payload in items.items():
+        local_cache.set(key, payload, len(payload), min(ttl, L1_CACHE_MAX_TTL), ttl)
+    try:
+        r = await get_redis()
+        if r and items:
+            async with r.pipeline(transaction=False) as pipe:
+                for key, payload in items.items():
+                    pipe.setex(redis_key(key), ttl, payload)
+                    if stale and CACHE_STALE_TTL > 0:
+                        # Outlives the fresh key so waiters have something to serve
+                        pipe.setex(redis_key(f"stale:{key}"), ttl + CACHE_STALE_TTL, payload)
+                    pipe.publish(CACHE_INVALIDATION_CHANNEL, json.dumps({"key": key, "worker": WORKER_ID}))
+                await pipe.execute()
     except Exception as e:
         logging.error(f"Cache set error: {e}")
 
-async def fetch_from_data_gov(district_code: str, month: int, year: int) -> Dict[str, Any]:
-    """Fetch performance data from data.gov.in API if enabled; else return mock.
+async def cache_invalidate(*keys: str):
+    """Drop keys from Redis and from every worker's local cache."""
+    for key in keys:
+        local_cache.delete(key)
+        local_cache.delete(f"stale:{key}")
+    try:
+        r = await get_redis()
+        if r and keys:
+            async with r.pipeline(transaction=False) as pipe:
+                pipe.delete(*(redis_key(k) for k in keys), *(redis_key(f"stale:{k}") for k in keys))
+                for key in keys:
+                    pipe.publish(CACHE_INVALIDATION_CHANNEL, json.dumps({"key": key, "worker": WORKER_ID}))
+                await pipe.execute()
+    except Exception as e:
+        logging.error(f"Cache invalidate error: {e}")
 
-    This implementation makes a best-effort query against the provided resource.
-    It attempts to map common field names; if data is unavailable or parsing fails,
-    it falls back to mock data to keep the app responsive.
+# Reconnect delays (seconds) for the invalidation listener, doubling per failure
+INVALIDATION_RETRY_MIN = 1.0
+INVALIDATION_RETRY_MAX = 60.0
+
+async def listen_for_invalidations():
+    """Evict local cache entries that other workers have rewritten or deleted."""
+    delay = INVALIDATION_RETRY_MIN
+    while True:
+        try:
+            r = await get_redis()
+            if r is None:
+                return
+            pubsub = r.pubsub()
+            await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+            # Messages may have been missed while we were disconnected
+            local_cache.clear()
+            delay = INVALIDATION_RETRY_MIN
+            try:
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    if data.get("worker") != WORKER_ID:
+                        local_cache.delete(data["key"])
+                        local_cache.delete(f"stale:{data['key']}")
+            finally:
+                await pubsub.aclose()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Keep serving the local cache while Redis is away; it is cleared
+            # once after resubscribing
+            logging.warning(f"Cache invalidation listener error: {e}. Reconnecting in {delay:.0f}s.")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, INVALIDATION_RETRY_MAX)
+
+# Computations in flight in this process, keyed by cache key
+_inflight: Dict[str, asyncio.Task] = {}
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+async def _acquire_cache_lock(key: str) -> Optional[str]:
+    """Take the recompute lock for `key` and return its token, or None if
+    another worker holds it. Without Redis the lock is always granted."""
+    token = uuid.uuid4().hex
+    r = await get_redis()
+    if r:
+        try:
+            if not await r.set(redis_key(f"lock:{key}"), token, nx=True, px=int(CACHE_LOCK_TTL * 1000)):
+                return None
+        except Exception as e:
+            logging.error(f"Cache lock error: {e}")
+    return token
+
+async def _release_cache_lock(key: str, token: str):
+    r = await get_redis()
+    if r:
+        try:
+            await r.eval(_RELEASE_LOCK_SCRIPT, 1, redis_key(f"lock:{key}"), token)
+        except Exception as e:
+            logging.error(f"Cache unlock error: {e}")
+
+async def _recompute_with_lock(key: str, ttl: int, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+    token = await _acquire_cache_lock(key)
+    if token is None:
+        # Another worker is recomputing: serve stale data if we still have it,
+        # otherwise wait briefly for the fresh value to appear. Stale copies
+        # are read from Redis only, so an invalidation cannot leave one in L1
+        stale = await cache_get(f"stale:{key}", local=False)
+        if stale is not None:
+            return stale
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + CACHE_LOCK_WAIT
+        while loop.time() < deadline:
+            await asyncio.sleep(0.05)
+            value = await cache_get(key)
+            if value is not None:
+                return value
+        # The lock holder is slow or gone; compute it ourselves
+
+    try:
+        value = await compute()
+        await cache_set(key, value, ttl)
+        return value
+    finally:
+        if token is not None:
+            await _release_cache_lock(key, token)
+
+async def cache_get_or_set(key: str, ttl: int, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+    """Return the cached payload for `key`, computing and caching it on a miss.
+
+    Concurrent misses on the same key share one in-flight computation in this
+    process, and a Redis lock keeps other workers from recomputing it too.
+    """
+    cached = await cache_get(key)
+    if cached is not None:
+        return cached
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_recompute_with_lock(key, ttl, compute))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _inflight.pop(key, None) if _inflight.get(key) is t else None)
+    # Shield so one cancelled request does not cancel the shared computation
+    return await asyncio.shield(task)
+
+def encode_response(model: BaseModel) -> bytes:
+    """Serialize a validated response model to JSON bytes."""
+    return orjson.dumps(model.model_dump(), option=orjson.OPT_NAIVE_UTC)
+
+def response_builder(response_model: type, build: Callable[[], Awaitable[Any]]) -> Callable[[], Awaitable[bytes]]:
+    """Wrap a data builder so it returns the encoded `response_model` body."""
+    async def _compute() -> bytes:
+        return encode_response(response_model(success=True, data=await build()))
+    return _compute
+
+def etag_for(body: bytes) -> str:
+    """Weak ETag for a response body. It is weak because GZipMiddleware may
+    send the same tag on gzip and identity encodings of the body."""
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    etag = _opaque_tag(etag)
+    return any(_opaque_tag(t.strip()) == etag for t in if_none_match.split(","))
+
+async def cached_response(
+    request: Request,
+    key: str,
+    ttl: int,
+    response_model: type,
+    build: Callable[[], Awaitable[Any]],
+) -> Response:
+    """Serve `key` from the cache as raw JSON bytes.
+
+    Only the miss path builds and validates `response_model(success=True,
+    data=...)`; hits return the stored body without parsing it. Responses
+    carry an ETag and a Cache-Control max-age of the entry's remaining TTL,
+    and a request whose If-None-Match matches gets an empty 304.
+    """
+    compute = response_builder(response_model, build)
+    if CACHE_WARM_ENABLED:
+        hot_keys.touch(key, ttl, compute)
+    body = await cache_get_or_set(key, ttl, compute)
+    return conditional_response(request, body, await remaining_ttl(key, ttl))
+
+async def remaining_ttl(key: str, ttl: int) -> int:
+    """Whole seconds the cached `key` has left, at most `ttl`, so clients do
+    not keep a body past the server's own expiry. Read from the L1 entry when
+    there is one, otherwise from Redis; 0 if neither has the key."""
+    left = local_cache.origin_ttl(key)
+    if left is None:
+        (left,) = await cache_ttls([key])
+    return int(min(left, ttl)) if left is not None else 0
+
+def conditional_response(request: Request, body: bytes, ttl: int) -> Response:
+    """JSON response with an ETag and Cache-Control, or an empty 304 when the
+    request's If-None-Match already has this body."""
+    headers = {
+        "ETag": etag_for(body),
+        "Cache-Control": f"public, max-age={ttl}, stale-while-revalidate={max(CACHE_STALE_TTL, 0)}",
+    }
+    not_modified = etag_matches(request.headers.get("if-none-match"), headers["ETag"])
+    # GZipMiddleware adds Vary itself when it compresses; every other response
+    # needs it too so shared caches keep the encodings apart
+    if (
+        not_modified
+        or len(body) < GZIP_MINIMUM_SIZE
+        or "gzip" not in request.headers.get("accept-encoding", "")
+    ):
+        headers["Vary"] = "Accept-Encoding"
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+class HotKeyTracker:
+    """Recently served cache keys, with what is needed to rebuild them.
+
+    Hits are counted in fixed windows of `window` seconds; a key is hot when
+    the current or the previous window saw at least `min_hits` requests.
+    Keys idle for two windows are forgotten, and at most `max_keys` are kept
+    (least recently requested first out).
+    """
+
+    def __init__(self, max_keys: int, window: float, min_hits: int):
+        self.max_keys = max_keys
+        self.window = window
+        self.min_hits = min_hits
+        # key -> [ttl, compute, hits, previous_hits, window_start]
+        self._keys: "OrderedDict[str, List[Any]]" = OrderedDict()
+
+    def touch(self, key: str, ttl: int, compute: Callable[[], Awaitable[bytes]]):
+        now = time.monotonic()
+        entry = self._keys.get(key)
+        if entry is None:
+            self._keys[key] = [ttl, compute, 1, 0, now]
+            if len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+            return
+        self._roll(entry, now)
+        entry[0], entry[1] = ttl, compute
+        entry[2] += 1
+        self._keys.move_to_end(key)
+
+    def _roll(self, entry: List[Any], now: float):
+        elapsed = now - entry[4]
+        if elapsed >= self.window:
+            # The previous window only counts if it ended just now
+            entry[3] = entry[2] if elapsed < 2 * self.window else 0
+            entry[2] = 0
+            entry[4] = now
+
+    def hot(self) -> List[Tuple[str, int, Callable[[], Awaitable[bytes]]]]:
+        """Return (key, ttl, compute) for hot keys, dropping idle ones."""
+        now = time.monotonic()
+        hot = []
+        for key, entry in list(self._keys.items()):
+            self._roll(entry, now)
+            if entry[2] == 0 and entry[3] == 0:
+                del self._keys[key]
+            elif max(entry[2], entry[3]) >= self.min_hits:
+                hot.append((key, entry[0], entry[1]))
+        return hot
+
+    def clear(self):
+        self._keys.clear()
+
+hot_keys = HotKeyTracker(CACHE_WARM_MAX_KEYS, CACHE_WARM_WINDOW, CACHE_WARM_MIN_HITS)
+
+async def cache_ttls(keys: List[str]) -> List[Optional[float]]:
+    """Seconds each key has left in the cache; None for missing keys."""
+    r = await get_redis()
+    if r:
+        try:
+            async with r.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.pttl(redis_key(key))
+                pttls = await pipe.execute()
+            # -2: missing, -1: no expiry
+            return [None if p == -2 else (float("inf") if p == -1 else p / 1000) for p in pttls]
+        except Exception as e:
+            logging.error(f"Cache ttl error: {e}")
+    return [local_cache.ttl(key) for key in keys]
+
+async def refresh_cache_key(key: str, ttl: int, compute: Callable[[], Awaitable[bytes]]) -> bool:
+    """Rebuild `key` in the background; skipped if someone is already on it."""
+    if key in _inflight:
+        return False
+    token = await _acquire_cache_lock(key)
+    if token is None:
+        return False
+    try:
+        await cache_set(key, await compute(), ttl)
+        return True
+    finally:
+        await _release_cache_lock(key, token)
+
+async def refresh_in_batches(jobs: List[Tuple[str, int, Callable[[], Awaitable[bytes]]]], reason: str) -> int:
+    """Run refresh jobs with at most CACHE_WARM_CONCURRENCY in flight."""
+    semaphore = asyncio.Semaphore(CACHE_WARM_CONCURRENCY)
+
+    async def _run(key: str, ttl: int, compute: Callable[[], Awaitable[bytes]]) -> bool:
+        async with semaphore:
+            try:
+                refreshed = await refresh_cache_key(key, ttl, compute)
+            except Exception as e:
+                logging.warning(f"Cache refresh of {key} failed: {e}")
+                return False
+        if refreshed:
+            CACHE_REFRESHES.labels(cache_prefix(key), reason).inc()
+        return refreshed
+
+    results = await asyncio.gather(*(_run(*job) for job in jobs))
+    return sum(results)
+
+async def refresh_hot_keys() -> int:
+    """Rebuild hot keys that are missing or about to expire."""
+    hot = hot_keys.hot()
+    if not hot:
+        return 0
+    remaining = await cache_ttls([key for key, _, _ in hot])
+    due = [job for job, left in zip(hot, remaining) if left is None or left < CACHE_WARM_REFRESH_AHEAD]
+    return await refresh_in_batches(due, "hot") if due else 0
+
+async def prebuild_month(month: int, year: int) -> int:
+    """Build the new month's performance, compare, history and dashboard
+    entries of every known district, with the builders their routes use."""
+    codes = snapshot.district_codes() if snapshot is not None else await db.districts.distinct("district_code")
+    jobs = []
+    for code in codes:
+        jobs.append((
+            f"performance:{code}:{month}:{year}",
+            CURRENT_MONTH_TTL,
+            response_builder(PerformanceResponse, partial(build_current_performance, code, month, year)),
+        ))
+        jobs.append((
+            f"compare:{code}:{month}:{year}",
+            CURRENT_MONTH_TTL,
+            response_builder(ComparisonResponse, partial(build_compare, code)),
+        ))
+        for months in CACHE_WARM_HISTORY_MONTHS:
+            jobs.append((
+                f"history:{code}:{months}",
+                7200,
+                response_builder(HistoricalResponse, partial(build_history, code, months)),
+            ))
+            jobs.append((
+                f"dashboard:{code}:{months}:{month}:{year}",
+                CURRENT_MONTH_TTL,
+                response_builder(DashboardResponse, partial(build_dashboard, code, months)),
+            ))
+    return await refresh_in_batches(jobs, "rollover")
+
+async def _claim_rollover(month: int, year: int) -> bool:
+    """Only one worker pre-builds a month; without Redis every worker does."""
+    r = await get_redis()
+    if r:
+        try:
+            return bool(await r.set(redis_key(f"warm:{month}:{year}"), WORKER_ID, nx=True, ex=86400))
+        except Exception as e:
+            logging.error(f"Cache warm claim error: {e}")
+    return True
+
+async def run_cache_warmer():
+    """Background loop: refresh hot keys ahead of expiry and pre-build the
+    new month's entries when the calendar month changes."""
+    period = recent_periods(1)[0]
+    while True:
+        await asyncio.sleep(CACHE_WARM_INTERVAL)
+        try:
+            current = recent_periods(1)[0]
+            if current != period:
+                period = current
+                if await _claim_rollover(*current):
+                    started = time.perf_counter()
+                    built = await prebuild_month(*current)
+                    logging.info(f"Pre-built {built} cache entries for {current[0]}/{current[1]} "
+                                 f"in {time.perf_counter() - started:.1f}s")
+            await refresh_hot_keys()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"Cache warmer error: {e}")
+
+# Upstream field names vary between data.gov.in resources; first match wins
+DATA_GOV_FIELD_ALIASES: Dict[str, List[str]] = {
+    'total_workers': ['total_workers', 'workers_total', 'tot_workers', 'households_worked'],
+    'work_completed': ['work_completed', 'works_completed', 'completed_works'],
+    'work_ongoing': ['work_ongoing', 'works_ongoing', 'ongoing_works'],
+    'average_wage': ['average_wage', 'avg_wage', 'wage_avg'],
+    'budget_allocated': ['budget_allocated', 'funds_allocated', 'allocated_funds'],
+    'budget_spent': ['budget_spent', 'expenditure', 'funds_spent'],
+    'person_days_generated': ['person_days_generated', 'persondays', 'person_days', 'person_days_total'],
+}
+DATA_GOV_INT_FIELDS = {'total_workers', 'work_completed', 'work_ongoing', 'person_days_generated'}
+
+def pick_num(rec: Dict[str, Any], keys: List[str], default: float = 0) -> float:
+    for k in keys:
+        if k in rec and rec[k] not in (None, ""):
+            try:
+                return float(rec[k])
+            except Exception:
+                pass
+    return float(default)
+
+def compile_field_mapping(field_names: Iterable[str]) -> Dict[str, List[str]]:
+    """Resolve DATA_GOV_FIELD_ALIASES against a resource's field list.
+
+    Returns, per metric, only the aliases the resource actually has, in
+    priority order, so a page of records can be mapped without probing
+    every alias of every record.
+    """
+    present = set(field_names)
+    return {field: [a for a in aliases if a in present] for field, aliases in DATA_GOV_FIELD_ALIASES.items()}
+
+def map_data_gov_record(
+    rec: Dict[str, Any],
+    district_code: str,
+    month: int,
+    year: int,
+    mapping: Optional[Dict[str, List[str]]] = None,
+) -> Dict[str, Any]:
+    """Map a data.gov.in record to our schema; fallback to zeros when missing."""
+    mapped: Dict[str, Any] = {'district_code': district_code, 'month': month, 'year': year}
+    for field, aliases in (mapping or DATA_GOV_FIELD_ALIASES).items():
+        value = pick_num(rec, aliases, 0)
+        mapped[field] = int(value) if field in DATA_GOV_INT_FIELDS else round(value, 2)
+    return mapped
+
+class CircuitBreaker:
+    """Per-worker circuit breaker for an upstream dependency.
+
+    Closed: calls go through. After `failure_threshold` consecutive failures it
+    opens and calls fail fast for `reset_timeout` seconds. It then lets a single
+    probe through (half-open); the probe's outcome closes or re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._set_state(self.CLOSED)
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            self._set_state(self.HALF_OPEN)
+            self.probe_started = now
+            return True
+        # Half-open: one probe at a time, unless the last one never reported back
+        if now - self.probe_started >= self.reset_timeout:
+            self.probe_started = now
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != self.CLOSED:
+            logging.info("data.gov.in circuit closed")
+            self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logging.warning(f"data.gov.in circuit opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+    def _set_state(self, state: str):
+        self.state = state
+        for s in (self.CLOSED, self.OPEN, self.HALF_OPEN):
+            UPSTREAM_CIRCUIT_STATE.labels(s).set(1 if s == state else 0)
+
+data_gov_breaker = CircuitBreaker(DATA_GOV_BREAKER_THRESHOLD, DATA_GOV_BREAKER_RESET)
+
+async def fetch_performance(district_code: str, month: int, year: int) -> Tuple[Dict[str, Any], bool]:
+    """Fetch performance data from data.gov.in if enabled; else return mock.
+
+    Returns (row, authoritative). The row is mock data whenever the upstream
+    is disabled, known to have nothing for the key, unavailable (circuit
+    open) or failing; `authoritative` is False for those fallbacks when the
+    upstream is enabled, so callers can avoid persisting them.
     """
     if not USE_DATA_GOV:
-        return generate_mock_performance_data(district_code, month, year)
+        MOCK_FALLBACKS.labels("disabled").inc()
+        return generate_mock_performance_data(district_code, month, year), True
+
+    missing_key = f"missing:{district_code}:{month}:{year}"
+    if await cache_get(missing_key) is not None:
+        MOCK_FALLBACKS.labels("known_missing").inc()
+        return generate_mock_performance_data(district_code, month, year), False
 
-    base_url = f"https://api.data.gov.in/resource/{DATA_GOV_RESOURCE_ID}"
+    if not data_gov_breaker.allow():
+        MOCK_FALLBACKS.labels("circuit_open").inc()
+        return generate_mock_performance_data(district_code, month, year), False
+
+    base_url = f"{DATA_GOV_BASE_URL}/resource/{DATA_GOV_RESOURCE_ID}"
     params = {
         'api-key': DATA_GOV_API_KEY,
         'format': 'json',
@@ -171,353 +1311,768 @@ async def fetch_from_data_gov(district_code: str, month: int, year: int) -> Dict
         'filters[year]': str(year),
     }
 
-    def pick_num(rec: Dict[str, Any], keys: list[str], default: float = 0) -> float:
-        for k in keys:
-            if k in rec and rec[k] not in (None, ""):
-                try:
-                    return float(rec[k])
-                except Exception:
-                    pass
-        return float(default)
-
     try:
-        async with httpx.AsyncClient(timeout=8.0) as client_http:
-            resp = await client_http.get(base_url, params=params)
-            resp.raise_for_status()
-            payload = resp.json()
-            records = payload.get('records') or payload.get('data') or []
-            if not records:
-                return generate_mock_performance_data(district_code, month, year)
-            rec = records[0]
-
-            # Map likely fields to our schema; fallback to zeros when missing
-            return {
-                'district_code': district_code,
-                'month': month,
-                'year': year,
-                'total_workers': int(pick_num(rec, ['total_workers', 'workers_total', 'tot_workers', 'households_worked'] , 0)),
-                'work_completed': int(pick_num(rec, ['work_completed', 'works_completed', 'completed_works'], 0)),
-                'work_ongoing': int(pick_num(rec, ['work_ongoing', 'works_ongoing', 'ongoing_works'], 0)),
-                'average_wage': round(pick_num(rec, ['average_wage', 'avg_wage', 'wage_avg'], 0.0), 2),
-                'budget_allocated': round(pick_num(rec, ['budget_allocated', 'funds_allocated', 'allocated_funds'], 0.0), 2),
-                'budget_spent': round(pick_num(rec, ['budget_spent', 'expenditure', 'funds_spent'], 0.0), 2),
-                'person_days_generated': int(pick_num(rec, ['person_days_generated', 'persondays', 'person_days', 'person_days_total'], 0)),
-            }
+        # Bound concurrent upstream calls so traffic spikes queue here instead
+        # of opening a burst of connections to api.data.gov.in
+        async with upstream_semaphore:
+            UPSTREAM_REQUESTS_IN_FLIGHT.inc()
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                resp = await get_http_client().get(base_url, params=params)
+                outcome = str(resp.status_code)
+            finally:
+                UPSTREAM_REQUESTS_IN_FLIGHT.dec()
+                UPSTREAM_REQUEST_DURATION.labels(outcome).observe(time.perf_counter() - started)
+        resp.raise_for_status()
+        payload = resp.json()
     except Exception as e:
+        data_gov_breaker.record_failure()
+        UPSTREAM_FAILURES.labels(type(e).__name__).inc()
+        MOCK_FALLBACKS.labels("error").inc()
         logging.warning(f"data.gov.in fetch failed, falling back to mock: {e}")
-        return generate_mock_performance_data(district_code, month, year)
+        return generate_mock_performance_data(district_code, month, year), False
+
+    data_gov_breaker.record_success()
+    records = payload.get('records') or payload.get('data') or []
+    if not records:
+        # Remember the gap so we stop asking until DATA_GOV_MISSING_TTL passes
+        await cache_set(missing_key, b"1", DATA_GOV_MISSING_TTL, stale=False)
+        MOCK_FALLBACKS.labels("empty").inc()
+        return generate_mock_performance_data(district_code, month, year), False
+    try:
+        return map_data_gov_record(records[0], district_code, month, year), True
+    except Exception as e:
+        MOCK_FALLBACKS.labels("error").inc()
+        logging.warning(f"data.gov.in record could not be mapped, falling back to mock: {e}")
+        return generate_mock_performance_data(district_code, month, year), False
+
+async def fetch_from_data_gov(district_code: str, month: int, year: int) -> Dict[str, Any]:
+    """Fetch performance data from data.gov.in API if enabled; else return mock.
+
+    This implementation makes a best-effort query against the provided resource.
+    It attempts to map common field names; if data is unavailable or parsing fails,
+    it falls back to mock data to keep the app responsive.
+    """
+    row, _ = await fetch_performance(district_code, month, year)
+    return row
 
 def generate_mock_performance_data(district_code: str, month: int, year: int) -> Dict[str, Any]:
-    """Generate realistic mock data for demonstration"""
-    import random
-    base_seed = hash(f"{district_code}{month}{year}")
-    random.seed(base_seed)
-    
+    """Generate realistic mock data for demonstration.
+
+    Values are derived from a stable hash of the key, so every worker (and
+    synthetic_data.py's bulk generator) produces the same numbers for it.
+    """
     return {
         "district_code": district_code,
         "month": month,
         "year": year,
-        "total_workers": random.randint(5000, 50000),
-        "work_completed": random.randint(50, 200),
-        "work_ongoing": random.randint(10, 100),
-        "average_wage": round(random.uniform(180.0, 250.0), 2),
-        "budget_allocated": round(random.uniform(10000000, 50000000), 2),
-        "budget_spent": round(random.uniform(5000000, 45000000), 2),
-        "person_days_generated": random.randint(100000, 500000)
+        **mock_performance_values(district_code, month, year),
     }
 
+def recent_periods(months: int, now: Optional[datetime] = None) -> List[Tuple[int, int]]:
+    """Return (month, year) pairs for the last `months` calendar months, newest first."""
+    now = now or datetime.now(timezone.utc)
+    index = now.year * 12 + (now.month - 1)
+    return [((i % 12) + 1, i // 12) for i in range(index, index - months, -1)]
+
+async def load_performance_window(district_code: str, periods: List[Tuple[int, int]]) -> Dict[Tuple[int, int], Dict[str, Any]]:
+    """Load performance rows for the given (month, year) periods of one district.
+
+    Cached months are read with a single query; missing months are fetched
+    from data.gov.in concurrently and stored with one bulk upsert.
+    """
+    window: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    if not periods:
+        return window
+
+    if snapshot is not None:
+        window = snapshot.window(district_code, periods)
+    else:
+        rows = iter_performance_rows({
+            "district_code": district_code,
+            "$or": [{"month": m, "year": y} for m, y in periods],
+        })
+        async for doc in rows:
+            window.setdefault((doc["month"], doc["year"]), doc)
+
+    missing = [p for p in periods if p not in window]
+    if missing:
+        fetched = await asyncio.gather(
+            *(fetch_performance(district_code, m, y) for m, y in missing)
+        )
+        new_docs = [(new_performance_row(api_data), authoritative) for api_data, authoritative in fetched]
+        # Fallback rows are served but not stored, so real data can replace
+        # them once the upstream has it
+        if snapshot is None:
+            await upsert_performance_rows([doc for doc, authoritative in new_docs if authoritative])
+        for doc, _ in new_docs:
+            window[(doc["month"], doc["year"])] = doc
+
+    return window
+
 # API Routes
 @api_router.get("/")
 async def root():
     return {"message": "MGNREGA Dashboard API", "version": "1.0"}
 
-@api_router.get("/districts", response_model=DistrictResponse)
-async def get_districts(state_code: str = Query("UP")):
-    """Get all districts for a state (deduped by district_code)."""
-    try:
-        cache_key = f"districts:{state_code}"
-        cached_data = await cache_get(cache_key)
-        
-        if cached_data:
-            return DistrictResponse(success=True, data=cached_data)
-        
-        # Fetch and deduplicate in Python by normalized district_code
+async def load_districts(state_code: str) -> List[Dict[str, Any]]:
+    """Load districts for a state from the DB or snapshot (deduped by district_code)."""
+    # Fetch and deduplicate in Python by normalized district_code
+    if snapshot is not None:
+        districts_raw = snapshot.districts(state_code)
+    else:
         districts_raw = await db.districts.find(
             {"state_code": state_code},
             {"_id": 0}
         ).sort("district_name", 1).to_list(1000)
 
-        def _normalize(d: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-            code = str(d.get("district_code", "")).strip().upper()
-            if not code:
-                return None
-            d["district_code"] = code
-            # Also trim names if present
-            if d.get("district_name"):
-                d["district_name"] = str(d["district_name"]).strip()
-            if d.get("district_name_hi"):
-                d["district_name_hi"] = str(d["district_name_hi"]).strip()
-            return d
-
-        dedup: Dict[str, Dict[str, Any]] = {}
-        for d in districts_raw:
-            nd = _normalize(d)
-            if not nd:
-                continue
-            code = nd["district_code"]
-            if code not in dedup:
-                dedup[code] = nd
-        districts = list(dedup.values())
-
-        if not districts:
-            # As a fallback, load from data file without writing to DB
-            data_file = ROOT_DIR / 'data' / 'up_districts.json'
-            try:
-                with open(data_file, 'r', encoding='utf-8') as f:
-                    file_items = json.load(f)
-                tmp: Dict[str, Dict[str, Any]] = {}
-                for d in file_items:
-                    code = str(d.get("district_code", "")).strip().upper()
-                    if not code:
-                        continue
-                    if code not in tmp:
-                        tmp[code] = {
-                            "id": str(uuid.uuid4()),
-                            "district_code": code,
-                            "district_name": (d.get("district_name") or "").strip(),
-                            "district_name_hi": (d.get("district_name_hi") or d.get("district_name") or "").strip(),
-                            "state_code": state_code,
-                            "state_name": "Uttar Pradesh" if state_code == "UP" else "",
-                            "state_name_hi": "उत्तर प्रदेश" if state_code == "UP" else "",
-                        }
-                districts = list(tmp.values())
-            except Exception as _:
-                districts = []
-        
-        await cache_set(cache_key, districts, 86400)  # Cache for 24 hours
-        return DistrictResponse(success=True, data=districts)
+    def _normalize(d: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        code = str(d.get("district_code", "")).strip().upper()
+        if not code:
+            return None
+        d["district_code"] = code
+        # Also trim names if present
+        if d.get("district_name"):
+            d["district_name"] = str(d["district_name"]).strip()
+        if d.get("district_name_hi"):
+            d["district_name_hi"] = str(d["district_name_hi"]).strip()
+        return d
+
+    dedup: Dict[str, Dict[str, Any]] = {}
+    for d in districts_raw:
+        nd = _normalize(d)
+        if not nd:
+            continue
+        code = nd["district_code"]
+        if code not in dedup:
+            dedup[code] = nd
+    districts = list(dedup.values())
+
+    if not districts:
+        # As a fallback, serve the registry's copy without writing to DB
+        districts = district_registry.districts(state_code)
+    return districts
+
+async def refresh_district_registry():
+    """Rebuild the registry from the seed data overlaid with stored districts."""
+    global district_registry
+    try:
+        if snapshot is not None:
+            stored = snapshot.districts()
+        else:
+            stored = await db.districts.find({}, {"_id": 0}).to_list(None)
+        district_registry = DistrictRegistry(seed_entries() + stored)
+    except Exception as e:
+        logging.error(f"District registry refresh failed, keeping seed data: {e}")
+
+async def build_current_performance(district_code: str, month: int, year: int) -> Dict[str, Any]:
+    window = await load_performance_window(district_code, [(month, year)])
+    return window[(month, year)]
+
+async def build_history(district_code: str, months: int) -> List[Dict[str, Any]]:
+    periods = recent_periods(months)
+    window = await load_performance_window(district_code, periods)
+    # Oldest first
+    return [window[p] for p in reversed(periods)]
+
+COMPARED_METRICS = ("total_workers", "work_completed", "budget_spent", "person_days_generated")
+
+def build_comparison(current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, Any]:
+    """Month-over-month percentage change for the headline metrics."""
+    return {
+        "current": current,
+        "previous": previous,
+        "changes": {
+            metric: ((current[metric] - previous[metric]) / previous[metric] * 100) if previous[metric] > 0 else 0
+            for metric in COMPARED_METRICS
+        }
+    }
+
+async def build_compare(district_code: str) -> Dict[str, Any]:
+    """This month against the previous one."""
+    current_period, previous_period = recent_periods(2)
+    window = await load_performance_window(district_code, [current_period, previous_period])
+    return build_comparison(window[current_period], window[previous_period])
+
+async def build_dashboard(district_code: str, months: int) -> Dict[str, Any]:
+    """Current month, history and comparison computed from one window read."""
+    periods = recent_periods(max(months, 2))
+    window = await load_performance_window(district_code, periods)
+    return {
+        "current": window[periods[0]],
+        "history": [window[p] for p in reversed(periods[:months])],
+        "comparison": build_comparison(window[periods[0]], window[periods[1]]),
+    }
+
+@api_router.get("/districts", response_model=DistrictResponse)
+async def get_districts(request: Request, state_code: str = Query("UP")):
+    """Get all districts for a state (deduped by district_code)."""
+    try:
+        return await cached_response(
+            request,
+            f"districts:{state_code}",
+            86400,  # Cache for 24 hours
+            DistrictResponse,
+            lambda: load_districts(state_code)
+        )
     except Exception as e:
         logging.error(f"Error fetching districts: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/districts/search", response_model=DistrictResponse)
+async def search_districts(
+    q: str = Query(..., min_length=1, max_length=64),
+    state_code: Optional[str] = Query(None),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Autocomplete districts by code or English/Hindi name prefix"""
+    return DistrictResponse(success=True, data=district_registry.search(q, state_code, limit))
+
+@api_router.get("/districts/nearest", response_model=NearestDistrictsResponse)
+async def nearest_districts(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(1, ge=1, le=20),
+):
+    """Districts closest to a coordinate (e.g. the device location), nearest first"""
+    data = [
+        {**district, "distance_km": round(km, 3)}
+        for district, km in district_registry.nearest(lat, lon, k)
+    ]
+    return NearestDistrictsResponse(success=True, data=data)
+
+@api_router.get("/states", response_model=StatesResponse)
+async def get_states(request: Request):
+    """All states and union territories with their known district counts"""
+    body = orjson.dumps({"success": True, "data": district_registry.states})
+    return conditional_response(request, body, 86400)
+
 @api_router.get("/district/{district_code}/current", response_model=PerformanceResponse)
-async def get_current_performance(district_code: str):
+async def get_current_performance(request: Request, district_code: str):
     """Get current month's performance for a district"""
     try:
         now = datetime.now(timezone.utc)
-        cache_key = f"performance:{district_code}:{now.month}:{now.year}"
-        
-        cached_data = await cache_get(cache_key)
-        if cached_data:
-            return PerformanceResponse(success=True, data=cached_data)
-        
-        # Check if data exists in DB
-        perf_data = await db.performance_data.find_one(
-            {
-                "district_code": district_code,
-                "month": now.month,
-                "year": now.year
-            },
-            {"_id": 0}
+        return await cached_response(
+            request,
+            f"performance:{district_code}:{now.month}:{now.year}",
+            CURRENT_MONTH_TTL,
+            PerformanceResponse,
+            lambda: build_current_performance(district_code, now.month, now.year)
         )
-        
-        if not perf_data:
-            # Fetch from API or generate mock data
-            api_data = await fetch_from_data_gov(district_code, now.month, now.year)
-            perf_data = PerformanceData(**api_data).model_dump()
-            
-            # Store in DB
-            await db.performance_data.insert_one(perf_data)
-        
-        await cache_set(cache_key, perf_data, 3600)  # Cache for 1 hour
-        return PerformanceResponse(success=True, data=perf_data)
     except Exception as e:
         logging.error(f"Error fetching current performance: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/district/{district_code}/history", response_model=HistoricalResponse)
-async def get_historical_performance(district_code: str, months: int = Query(6, ge=1, le=24)):
+async def get_historical_performance(request: Request, district_code: str, months: int = Query(6, ge=1, le=24)):
     """Get historical performance data for a district"""
     try:
-        cache_key = f"history:{district_code}:{months}"
-        cached_data = await cache_get(cache_key)
-        
-        if cached_data:
-            return HistoricalResponse(success=True, data=cached_data)
-        
-        # Generate date range
-        now = datetime.now(timezone.utc)
-        historical_data = []
-        
-        for i in range(months):
-            date = now - timedelta(days=30 * i)
-            month, year = date.month, date.year
-            
-            # Check DB first
-            perf_data = await db.performance_data.find_one(
-                {"district_code": district_code, "month": month, "year": year},
-                {"_id": 0}
-            )
-            
-            if not perf_data:
-                # Generate or fetch data
-                api_data = await fetch_from_data_gov(district_code, month, year)
-                perf_data = PerformanceData(**api_data).model_dump()
-                await db.performance_data.insert_one(perf_data)
-            
-            historical_data.append(perf_data)
-        
-        historical_data.reverse()  # Oldest first
-        await cache_set(cache_key, historical_data, 7200)  # Cache for 2 hours
-        return HistoricalResponse(success=True, data=historical_data)
+        return await cached_response(
+            request,
+            f"history:{district_code}:{months}",
+            7200,  # Cache for 2 hours
+            HistoricalResponse,
+            lambda: build_history(district_code, months)
+        )
     except Exception as e:
         logging.error(f"Error fetching historical data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/district/{district_code}/compare", response_model=ComparisonResponse)
-async def compare_performance(district_code: str):
+async def compare_performance(request: Request, district_code: str):
     """Compare current month with previous month"""
+    try:
+        month, year = recent_periods(1)[0]
+        return await cached_response(
+            request,
+            f"compare:{district_code}:{month}:{year}",
+            CURRENT_MONTH_TTL,
+            ComparisonResponse,
+            lambda: build_compare(district_code)
+        )
+    except Exception as e:
+        logging.error(f"Error comparing performance: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/district/{district_code}/dashboard", response_model=DashboardResponse)
+async def get_district_dashboard(request: Request, district_code: str, months: int = Query(6, ge=1, le=24)):
+    """Current month, history and month-over-month changes in one response"""
     try:
         now = datetime.now(timezone.utc)
-        prev_month = now - timedelta(days=30)
-        
-        # Get current month data
-        current = await db.performance_data.find_one(
-            {"district_code": district_code, "month": now.month, "year": now.year},
-            {"_id": 0}
+        return await cached_response(
+            request,
+            f"dashboard:{district_code}:{months}:{now.month}:{now.year}",
+            CURRENT_MONTH_TTL,
+            DashboardResponse,
+            lambda: build_dashboard(district_code, months)
         )
-        
-        if not current:
-            api_data = await fetch_from_data_gov(district_code, now.month, now.year)
-            current = PerformanceData(**api_data).model_dump()
-            await db.performance_data.insert_one(current)
-        
-        # Get previous month data
-        previous = await db.performance_data.find_one(
-            {"district_code": district_code, "month": prev_month.month, "year": prev_month.year},
-            {"_id": 0}
+    except Exception as e:
+        logging.error(f"Error fetching dashboard: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def load_performance_batch(district_codes: List[str], month: int, year: int) -> Dict[str, Dict[str, Any]]:
+    """One month of performance for many districts, keyed by district code.
+
+    Cached rows come from one MGET, the misses from one $in query, and the
+    rest are fetched concurrently (bounded by the upstream semaphore) and
+    stored with one bulk upsert. Every row read or built here is written back
+    under the same key /district/{code}/current uses.
+    """
+    keys = [f"performance:{code}:{month}:{year}" for code in district_codes]
+    results: Dict[str, Dict[str, Any]] = {}
+    for code, body in zip(district_codes, await cache_get_many(keys)):
+        if body is not None:
+            results[code] = orjson.loads(body)["data"]
+
+    misses = [code for code in district_codes if code not in results]
+    if misses:
+        if snapshot is not None:
+            results.update(snapshot.month(misses, month, year))
+        else:
+            rows = iter_performance_rows({"district_code": {"$in": misses}, "month": month, "year": year})
+            async for doc in rows:
+                results[doc["district_code"]] = PerformanceData(**doc).model_dump()
+
+        unresolved = [code for code in misses if code not in results]
+        if unresolved:
+            fetched = await asyncio.gather(*(fetch_performance(code, month, year) for code in unresolved))
+            new_docs = []
+            for code, (row, authoritative) in zip(unresolved, fetched):
+                results[code] = new_performance_row(row)
+                if authoritative:
+                    new_docs.append(results[code])
+            if snapshot is None:
+                await upsert_performance_rows(new_docs)
+
+        await cache_set_many({
+            f"performance:{code}:{month}:{year}": encode_response(PerformanceResponse(success=True, data=results[code]))
+            for code in misses
+        }, CURRENT_MONTH_TTL)
+    return {code: results[code] for code in district_codes}
+
+@api_router.get("/performance", response_model=BatchPerformanceResponse)
+async def get_batch_performance(
+    request: Request,
+    codes: Optional[str] = Query(None, description="Comma-separated district codes"),
+    state_code: Optional[str] = Query(None, description="All districts of this state instead of codes"),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+):
+    """One month of performance for many districts in a single request"""
+    if bool(codes) == bool(state_code):
+        raise HTTPException(status_code=400, detail="Pass either codes or state_code")
+    district_codes = list(dict.fromkeys(c.strip().upper() for c in (codes or "").split(",") if c.strip()))
+    if len(district_codes) > PERFORMANCE_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {PERFORMANCE_BATCH_MAX} district codes per request")
+    try:
+        month, year = resolve_period(month, year)
+        if state_code:
+            state_code = state_code.upper()
+            # Shares the /districts cache entry
+            districts = await cache_get_or_set(
+                f"districts:{state_code}", 86400,
+                response_builder(DistrictResponse, lambda: load_districts(state_code)),
+            )
+            district_codes = [d["district_code"] for d in orjson.loads(districts)["data"]]
+        data = await load_performance_batch(district_codes, month, year)
+        body = orjson.dumps(
+            {"success": True, "month": month, "year": year, "data": data},
+            option=orjson.OPT_NAIVE_UTC,
         )
-        
-        if not previous:
-            api_data = await fetch_from_data_gov(district_code, prev_month.month, prev_month.year)
-            previous = PerformanceData(**api_data).model_dump()
-            await db.performance_data.insert_one(previous)
-        
-        # Calculate comparisons
-        comparison = {
-            "current": current,
-            "previous": previous,
-            "changes": {
-                "total_workers": ((current["total_workers"] - previous["total_workers"]) / previous["total_workers"] * 100) if previous["total_workers"] > 0 else 0,
-                "work_completed": ((current["work_completed"] - previous["work_completed"]) / previous["work_completed"] * 100) if previous["work_completed"] > 0 else 0,
-                "budget_spent": ((current["budget_spent"] - previous["budget_spent"]) / previous["budget_spent"] * 100) if previous["budget_spent"] > 0 else 0,
-                "person_days_generated": ((current["person_days_generated"] - previous["person_days_generated"]) / previous["person_days_generated"] * 100) if previous["person_days_generated"] > 0 else 0
-            }
+        # The batch is as fresh as its oldest row
+        remaining = await asyncio.gather(*(
+            remaining_ttl(f"performance:{code}:{month}:{year}", CURRENT_MONTH_TTL) for code in district_codes
+        ))
+        return conditional_response(request, body, min(remaining, default=CURRENT_MONTH_TTL))
+    except Exception as e:
+        logging.error(f"Error fetching batch performance: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+EXPORT_FIELDS = ("district_code", "year", "month") + tuple(DATA_GOV_FIELD_ALIASES) + ("timestamp",)
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+def parse_month_param(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """(month, year) from a YYYY-MM query value."""
+    if not value:
+        return None
+    year, month = value.split("-")
+    return int(month), int(year)
+
+def period_range_filter(start: Optional[Tuple[int, int]], end: Optional[Tuple[int, int]]) -> Dict[str, Any]:
+    """Row filter for the months from `start` to `end` inclusive; either may be open."""
+    clauses = []
+    if start:
+        m, y = start
+        clauses.append({"$or": [{"year": {"$gt": y}}, {"year": y, "month": {"$gte": m}}]})
+    if end:
+        m, y = end
+        clauses.append({"$or": [{"year": {"$lt": y}}, {"year": y, "month": {"$lte": m}}]})
+    return {"$and": clauses} if clauses else {}
+
+async def export_rows(
+    state_code: str, start: Optional[Tuple[int, int]], end: Optional[Tuple[int, int]]
+) -> AsyncIterator[Dict[str, Any]]:
+    """A state's rows between two (month, year) periods, in district and period order."""
+    if snapshot is not None:
+        for row in snapshot.iter_state_rows(state_code, start, end, list(EXPORT_FIELDS)):
+            yield row
+        return
+    query = {"district_code": state_district_filter(state_code), **period_range_filter(start, end)}
+    projection = {"_id": 0, **{f: 1 for f in EXPORT_FIELDS}}
+    async for row in iter_performance_rows(query, projection, sort=True):
+        yield row
+
+async def stream_export(rows: AsyncIterator[Dict[str, Any]], fmt: str) -> AsyncIterator[bytes]:
+    """Encode rows as they arrive from the cursor, in chunks of about
+    EXPORT_CHUNK_BYTES, so memory does not grow with the export size."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    chunk = bytearray()
+    if fmt == "csv":
+        writer.writerow(EXPORT_FIELDS)
+    try:
+        async for row in rows:
+            if fmt == "csv":
+                writer.writerow([row.get(f) for f in EXPORT_FIELDS])
+                chunk += buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                chunk += orjson.dumps({f: row.get(f) for f in EXPORT_FIELDS})
+                chunk += b"\n"
+            if len(chunk) >= EXPORT_CHUNK_BYTES:
+                yield bytes(chunk)
+                chunk.clear()
+        chunk += buffer.getvalue().encode()
+        if chunk:
+            yield bytes(chunk)
+    except Exception as e:
+        # Headers are already sent; aborting the body is the only way to signal failure
+        logging.error(f"Export failed mid-stream: {e}")
+        raise
+
+@api_router.get("/export/performance")
+async def export_performance(
+    state_code: str = Query(..., min_length=2),
+    from_: Optional[str] = Query(None, alias="from", pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="First month, YYYY-MM"),
+    to: Optional[str] = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="Last month, YYYY-MM"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+):
+    """Stream a state's performance rows as NDJSON or CSV (gzip-encoded when accepted)"""
+    state_code = state_code.upper()
+    start, end = parse_month_param(from_), parse_month_param(to)
+    if start and end and (start[1], start[0]) > (end[1], end[0]):
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    filename = "_".join(p for p in ("performance", state_code, from_, to) if p) + f".{format}"
+    return StreamingResponse(
+        stream_export(export_rows(state_code, start, end), format),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+RANKABLE_METRICS = SUMMED_METRICS + ("average_wage", "budget_utilization")
+
+def state_district_filter(state_code: str) -> Dict[str, Any]:
+    """Match a state's districts: codes with its prefix (e.g. UP01 for UP) plus
+    registry districts of the state coded otherwise (e.g. numeric LGD codes).
+    Both forms are index-backed."""
+    state_code = state_code.upper()
+    prefix = re.compile(f"^{re.escape(state_code)}[0-9]")
+    others = [
+        d["district_code"] for d in district_registry.districts(state_code)
+        if not prefix.match(d["district_code"])
+    ]
+    if not others:
+        return {"$regex": prefix.pattern}
+    return {"$in": [prefix, *others]}
+
+def resolve_period(month: Optional[int], year: Optional[int]) -> Tuple[int, int]:
+    now = datetime.now(timezone.utc)
+    return month or now.month, year or now.year
+
+# Budget utilization in percent; 0 when nothing was allocated
+BUDGET_UTILIZATION_EXPR = {
+    "$cond": [
+        {"$gt": ["$budget_allocated", 0]},
+        {"$multiply": [{"$divide": ["$budget_spent", "$budget_allocated"]}, 100]},
+        0,
+    ]
+}
+
+def format_state_summary(state_code: str, month: int, year: int, rollup: Dict[str, Any]) -> Dict[str, Any]:
+    count = rollup.get("districts_reporting", 0)
+    totals = {m: rollup.get("totals", {}).get(m, 0) for m in SUMMED_METRICS}
+    averages = {m: (totals[m] / count) if count else 0 for m in SUMMED_METRICS}
+    averages["average_wage"] = (rollup.get("average_wage_sum", 0) / count) if count else 0
+    allocated = totals["budget_allocated"]
+    return {
+        "state_code": state_code,
+        "month": month,
+        "year": year,
+        "districts_reporting": count,
+        "totals": totals,
+        "averages": averages,
+        "budget_utilization": (totals["budget_spent"] / allocated * 100) if allocated > 0 else 0,
+    }
+
+async def build_state_summary(state_code: str, month: int, year: int) -> Dict[str, Any]:
+    if snapshot is not None:
+        return format_state_summary(state_code, month, year, snapshot.state_totals(state_code, month, year, SUMMED_METRICS))
+    rollup = await db.state_monthly_rollups.find_one(
+        {"state_code": state_code, "year": year, "month": month},
+        {"_id": 0}
+    )
+    if rollup is None:
+        # No precomputed rollup yet (e.g. before a backfill); aggregate raw rows
+        collection, pipeline = performance_source(
+            {"district_code": state_district_filter(state_code), "month": month, "year": year}
+        )
+        pipeline += [
+            {"$group": {
+                "_id": None,
+                "districts_reporting": {"$sum": 1},
+                "average_wage_sum": {"$sum": "$average_wage"},
+                **{m: {"$sum": f"${m}"} for m in SUMMED_METRICS},
+            }},
+        ]
+        rows = await collection.aggregate(pipeline).to_list(1)
+        row = rows[0] if rows else {}
+        rollup = {
+            "districts_reporting": row.get("districts_reporting", 0),
+            "average_wage_sum": row.get("average_wage_sum", 0),
+            "totals": {m: row.get(m, 0) for m in SUMMED_METRICS},
         }
-        
-        return ComparisonResponse(success=True, data=comparison)
+    return format_state_summary(state_code, month, year, rollup)
+
+async def build_state_rankings(state_code: str, metric: str, month: int, year: int, ascending: bool = False) -> Dict[str, Any]:
+    if snapshot is not None:
+        rows = snapshot.rankings(state_code, metric, month, year, ascending)
+    else:
+        collection, pipeline = performance_source(
+            {"district_code": state_district_filter(state_code), "month": month, "year": year}
+        )
+        pipeline += [
+            {"$project": {
+                "_id": 0,
+                "district_code": 1,
+                "value": BUDGET_UTILIZATION_EXPR if metric == "budget_utilization" else f"${metric}",
+            }},
+            {"$sort": {"value": 1 if ascending else -1, "district_code": 1}},
+        ]
+        rows = await collection.aggregate(pipeline).to_list(None)
+        for rank, row in enumerate(rows, start=1):
+            row["rank"] = rank
+    return {
+        "state_code": state_code,
+        "metric": metric,
+        "month": month,
+        "year": year,
+        "order": "asc" if ascending else "desc",
+        "rankings": rows,
+    }
+
+rank_engine = RankEngine(RANK_MAX_TABLES, RANK_CHECK_INTERVAL)
+# Rank table builds in flight in this process, keyed like rank_engine
+_rank_builds: Dict[Tuple[str, int, int], asyncio.Task] = {}
+
+async def rank_signature(state_code: str, month: int, year: int) -> Any:
+    """Changes whenever rows of the state-month are added or rebuilt."""
+    if snapshot is not None:
+        return snapshot.manifest.get("built_at", "snapshot")
+    return await db.state_monthly_rollups.find_one(
+        {"state_code": state_code, "year": year, "month": month},
+        {"_id": 0, "districts_reporting": 1, "totals": 1, "average_wage_sum": 1}
+    )
+
+async def build_rank_table(state_code: str, month: int, year: int) -> RankTable:
+    """Rebuild the state-month's table unless its signature is unchanged."""
+    key = (state_code, year, month)
+    signature = await rank_signature(state_code, month, year)
+    entry = rank_engine.get(key)
+    # Without a rollup there is nothing to compare, so rebuild every check
+    if entry is not None and signature is not None and entry[0] == signature:
+        table = entry[2]
+    elif snapshot is not None:
+        idx = snapshot.state_month_indices(state_code, month, year)
+        table = RankTable(snapshot.rows(idx, ["district_code", *SUMMED_METRICS, "average_wage"]))
+    else:
+        rows = iter_performance_rows(
+            {"district_code": state_district_filter(state_code), "month": month, "year": year},
+            {"_id": 0, "district_code": 1, "average_wage": 1, **{m: 1 for m in SUMMED_METRICS}},
+        )
+        table = RankTable([row async for row in rows])
+    rank_engine.put(key, signature, table)
+    return table
+
+async def rank_table(state_code: str, month: int, year: int) -> RankTable:
+    """The state-month's rank table, rechecked at most every RANK_CHECK_INTERVAL."""
+    key = (state_code, year, month)
+    table = rank_engine.fresh(key)
+    if table is not None:
+        return table
+    task = _rank_builds.get(key)
+    if task is None:
+        task = asyncio.ensure_future(build_rank_table(state_code, month, year))
+        _rank_builds[key] = task
+        task.add_done_callback(lambda t: _rank_builds.pop(key, None) if _rank_builds.get(key) is t else None)
+    return await asyncio.shield(task)
+
+@api_router.get("/district/{district_code}/rank", response_model=DistrictRankResponse)
+async def get_district_rank(
+    district_code: str,
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+):
+    """Rank and percentile of a district within its state for one month"""
+    district_code = district_code.upper()
+    state_code = state_code_for_district(district_code)
+    if not state_code:
+        # Neither registered nor state-prefixed: there is no state to rank within
+        raise HTTPException(status_code=404, detail=f"Unknown state for district {district_code}")
+    month, year = resolve_period(month, year)
+    try:
+        table = await rank_table(state_code, month, year)
+        ranks = table.ranks(district_code)
     except Exception as e:
-        logging.error(f"Error comparing performance: {e}")
+        logging.error(f"Error ranking district: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    if ranks is None:
+        raise HTTPException(status_code=404, detail=f"No data for {district_code} in {month}/{year}")
+    return DistrictRankResponse(success=True, data={
+        "district_code": district_code,
+        "state_code": state_code,
+        "month": month,
+        "year": year,
+        "ranks": ranks,
+    })
 
-async def seed_default_districts(state_code: str = "UP") -> List[Dict[str, Any]]:
-    """Seed UP districts from data file; upsert missing entries so we reach full coverage."""
-    data_file = ROOT_DIR / 'data' / 'up_districts.json'
-    up_districts: List[Dict[str, Any]] = []
+@api_router.get("/district/{district_code}/fiscal-year", response_model=FiscalYearResponse)
+async def get_district_fiscal_year(district_code: str, fy: Optional[int] = Query(None, ge=2000, le=2100)):
+    """Cumulative totals for a district over an April-March fiscal year"""
     try:
-        if data_file.exists():
-            import json as _json
-            with open(data_file, 'r', encoding='utf-8') as f:
-                up_districts = _json.load(f)
+        district_code = district_code.upper()
+        if fy is None:
+            now = datetime.now(timezone.utc)
+            fy = fiscal_year_of(now.month, now.year)
+        if snapshot is not None:
+            totals = snapshot.fiscal_year_totals(district_code, fy, SUMMED_METRICS)
         else:
-            logging.warning(f"District data file not found: {data_file}. Seeding minimal defaults.")
-            up_districts = []
+            totals = await db.district_fy_totals.find_one(
+                {"district_code": district_code, "fiscal_year": fy},
+                {"_id": 0}
+            )
+            totals = totals or {}
+        months = totals.get("months_reporting", 0)
+        data = {
+            "district_code": district_code,
+            "state_code": state_code_for_district(district_code),
+            "fiscal_year": fy,
+            "fiscal_year_label": f"{fy}-{fy + 1}",
+            "months_reporting": months,
+            "totals": totals.get("totals") or {m: 0 for m in SUMMED_METRICS},
+            "average_wage": (totals.get("average_wage_sum", 0) / months) if months else 0,
+        }
+        return FiscalYearResponse(success=True, data=data)
     except Exception as e:
-        logging.warning(f"Failed to load districts file: {e}. Using minimal list.")
-        up_districts = []
+        logging.error(f"Error fetching fiscal year totals: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/state/{state_code}/summary", response_model=StateSummaryResponse)
+async def get_state_summary(
+    request: Request,
+    state_code: str,
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+):
+    """Totals and averages across a state's districts for one month"""
+    try:
+        state_code = state_code.upper()
+        month, year = resolve_period(month, year)
+        return await cached_response(
+            request,
+            f"state_summary:{state_code}:{month}:{year}",
+            CURRENT_MONTH_TTL,
+            StateSummaryResponse,
+            lambda: build_state_summary(state_code, month, year)
+        )
+    except Exception as e:
+        logging.error(f"Error fetching state summary: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/state/{state_code}/rankings", response_model=StateRankingsResponse)
+async def get_state_rankings(
+    request: Request,
+    state_code: str,
+    metric: str = Query("person_days_generated"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+):
+    """Districts of a state ranked by one metric for one month"""
+    if metric not in RANKABLE_METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(RANKABLE_METRICS)}")
+    try:
+        state_code = state_code.upper()
+        month, year = resolve_period(month, year)
+        return await cached_response(
+            request,
+            f"state_rankings:{state_code}:{metric}:{order}:{month}:{year}",
+            CURRENT_MONTH_TTL,
+            StateRankingsResponse,
+            lambda: build_state_rankings(state_code, metric, month, year, ascending=order == "asc")
+        )
+    except Exception as e:
+        logging.error(f"Error fetching state rankings: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def seed_default_districts(state_codes: Optional[Any] = None) -> List[Dict[str, Any]]:
+    """Upsert district metadata for the given states (default: every state with
+    known districts) with one unordered bulk write per state."""
+    from states_data import STATE_DISTRICTS
+
+    if state_codes is None:
+        state_codes = list(STATE_DISTRICTS)
+    elif isinstance(state_codes, str):
+        state_codes = [state_codes]
+    states_by_code = {s["code"]: s for s in INDIAN_STATES}
 
-    # Decorate and upsert
     results: List[Dict[str, Any]] = []
-    for d in up_districts:
-        # Normalize and sanitize values
-        raw_code = d.get("district_code", "")
-        norm_code = str(raw_code).strip().upper()
-        name_en = (d.get("district_name") or "").strip()
-        name_hi = (d.get("district_name_hi") or name_en).strip()
-
-        if not norm_code:
-            continue  # skip invalid entries
-
-        doc = {
-            "id": str(uuid.uuid4()),
-            "district_code": norm_code,
-            "district_name": name_en,
-            "district_name_hi": name_hi,
-            "state_code": "UP",
-            "state_name": "Uttar Pradesh",
-            "state_name_hi": "उत्तर प्रदेश",
-        }
-        # Upsert by district_code; then update key fields to normalized values
-        try:
-            await db.districts.update_one(
-                {"district_code": doc["district_code"]},
-                {"$setOnInsert": doc},
-                upsert=True
-            )
-            await db.districts.update_one(
-                {"district_code": doc["district_code"]},
-                {"$set": {
-                    "district_name": doc["district_name"],
-                    "district_name_hi": doc["district_name_hi"],
-                    "state_code": doc["state_code"],
-                    "state_name": doc["state_name"],
-                    "state_name_hi": doc["state_name_hi"]
-                }},
-                upsert=False
-            )
-            results.append(doc)
-        except Exception as e:
-            logging.warning(f"Upsert failed for {doc['district_code']}: {e}")
-
-    # If DB ended up empty (e.g., file missing), ensure at least what's in states_data
-    if not results:
-        from states_data import STATE_DISTRICTS
-        for d in STATE_DISTRICTS.get('UP', []):
-            raw_code = d.get("district_code", "")
-            norm_code = str(raw_code).strip().upper()
-            name_en = (d.get("district_name") or "").strip()
-            name_hi = (d.get("district_name_hi") or name_en).strip()
-
-            if not norm_code:
-                continue
+    seeded_states: List[str] = []
+    for state_code in (str(c).strip().upper() for c in state_codes):
+        state = states_by_code.get(state_code, {"code": state_code, "name": "", "name_hi": ""})
+        docs: Dict[str, Dict[str, Any]] = {}
+        for d in load_seed_districts(state_code):
+            doc = district_entry(d, state)
+            if doc is None or doc["district_code"] in docs:
+                continue  # skip invalid or repeated entries
+            docs[doc["district_code"]] = doc
+        if not docs:
+            continue
 
-            doc = {
-                "id": str(uuid.uuid4()),
-                "district_code": norm_code,
-                "district_name": name_en,
-                "district_name_hi": name_hi,
-                "state_code": "UP",
-                "state_name": "Uttar Pradesh",
-                "state_name_hi": "उत्तर प्रदेश",
-            }
-            await db.districts.update_one(
-                {"district_code": doc["district_code"]},
-                {"$setOnInsert": doc},
+        # One upsert per district: keep the id of existing rows, refresh the
+        # rest. Fields the seed data lacks (coordinates, mostly) are left out
+        # so they never overwrite values already stored.
+        ops = [
+            UpdateOne(
+                {"district_code": code},
+                {
+                    "$setOnInsert": {"id": str(uuid.uuid4())},
+                    "$set": {k: v for k, v in doc.items() if v is not None},
+                },
                 upsert=True
             )
-            await db.districts.update_one(
-                {"district_code": doc["district_code"]},
-                {"$set": {
-                    "district_name": doc["district_name"],
-                    "district_name_hi": doc["district_name_hi"],
-                    "state_code": doc["state_code"],
-                    "state_name": doc["state_name"],
-                    "state_name_hi": doc["state_name_hi"]
-                }},
-                upsert=False
-            )
-            results.append(doc)
+            for code, doc in docs.items()
+        ]
+        try:
+            await db.districts.bulk_write(ops, ordered=False)
+            results.extend(docs.values())
+            seeded_states.append(state_code)
+        except Exception as e:
+            logging.warning(f"District seeding failed for {state_code}: {e}")
 
+    if seeded_states:
+        await cache_invalidate(*(f"districts:{s}" for s in seeded_states))
     return results
 
 # Configure CORS origins robustly (strip quotes and whitespace)
@@ -542,6 +2097,17 @@ app.add_middleware(
 # Include router
 app.include_router(api_router)
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+# Compress JSON bodies for clients that accept it
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
+# Outermost, so the latency it records covers the other middleware too
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
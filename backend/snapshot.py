@@ -0,0 +1,329 @@
+"""Columnar snapshot of the performance rows and district metadata.
+
+A snapshot is a directory holding two tables, written by build_snapshot.py:
+
+    performance.arrow  one row per (district_code, year, month), sorted by them
+    districts.arrow    district metadata, sorted by (state_code, district_name)
+
+Arrow IPC files are memory-mapped, so every worker on a host shares the same
+page-cache copy and numeric columns are used in place as numpy arrays. The
+.parquet variant is smaller to ship but is decoded into memory when opened.
+
+With PERFORMANCE_SNAPSHOT pointing at such a directory the app answers reads
+from the snapshot instead of MongoDB (see PerformanceSnapshot).
+"""
+import json
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+SNAPSHOT_FORMATS = ("arrow", "parquet")
+
+PERFORMANCE_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("district_code", pa.string()),
+    ("month", pa.int8()),
+    ("year", pa.int16()),
+    ("total_workers", pa.int64()),
+    ("work_completed", pa.int64()),
+    ("work_ongoing", pa.int64()),
+    ("average_wage", pa.float64()),
+    ("budget_allocated", pa.float64()),
+    ("budget_spent", pa.float64()),
+    ("person_days_generated", pa.int64()),
+    ("timestamp", pa.timestamp("ms")),
+    # year * 12 + month - 1, so a period range is one integer comparison
+    ("period", pa.int32()),
+])
+DISTRICT_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("district_code", pa.string()),
+    ("district_name", pa.string()),
+    ("district_name_hi", pa.string()),
+    ("state_code", pa.string()),
+    ("state_name", pa.string()),
+    ("state_name_hi", pa.string()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+])
+METRIC_COLUMNS = (
+    "total_workers", "work_completed", "work_ongoing", "average_wage",
+    "budget_allocated", "budget_spent", "person_days_generated",
+)
+ROW_COLUMNS = [f for f in PERFORMANCE_SCHEMA.names if f != "period"]
+
+
+def period_index(month: int, year: int) -> int:
+    return year * 12 + month - 1
+
+
+def _state_prefix(district_code: str) -> str:
+    match = re.match(r"[A-Z]+", district_code)
+    return match.group(0) if match else ""
+
+
+def _performance_table(rows: Iterable[Dict[str, Any]]) -> pa.Table:
+    columns: Dict[str, List[Any]] = {name: [] for name in PERFORMANCE_SCHEMA.names}
+    for row in rows:
+        for name in ROW_COLUMNS:
+            value = row.get(name)
+            columns[name].append(0 if value is None and name in METRIC_COLUMNS else value)
+        columns["period"].append(period_index(row["month"], row["year"]))
+    table = pa.Table.from_pydict(columns, schema=PERFORMANCE_SCHEMA)
+    return table.sort_by([("district_code", "ascending"), ("period", "ascending")])
+
+
+def _district_table(districts: Iterable[Dict[str, Any]]) -> pa.Table:
+    columns: Dict[str, List[Any]] = {name: [] for name in DISTRICT_SCHEMA.names}
+    for d in districts:
+        for name in DISTRICT_SCHEMA.names:
+            columns[name].append(d.get(name))
+    table = pa.Table.from_pydict(columns, schema=DISTRICT_SCHEMA)
+    return table.sort_by([("state_code", "ascending"), ("district_name", "ascending")])
+
+
+def _write_table(table: pa.Table, path: Path, fmt: str):
+    # Write next to the target and rename, so workers that already mapped the
+    # previous file keep reading it until they reload
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "parquet":
+        pq.write_table(table, tmp)
+    else:
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            # One record batch keeps every column contiguous in the mapping
+            writer.write_table(table.combine_chunks(), max_chunksize=max(table.num_rows, 1))
+    os.replace(tmp, path)
+
+
+def write_snapshot(
+    directory: Path,
+    rows: Iterable[Dict[str, Any]],
+    districts: Iterable[Dict[str, Any]],
+    fmt: str = "arrow",
+) -> Dict[str, Any]:
+    """Write a snapshot directory; returns its manifest."""
+    directory.mkdir(parents=True, exist_ok=True)
+    performance = _performance_table(rows)
+    district_table = _district_table(districts)
+    _write_table(performance, directory / f"performance.{fmt}", fmt)
+    _write_table(district_table, directory / f"districts.{fmt}", fmt)
+    # A leftover build in the other format would otherwise shadow this one
+    for other in SNAPSHOT_FORMATS:
+        if other != fmt:
+            for name in ("performance", "districts"):
+                (directory / f"{name}.{other}").unlink(missing_ok=True)
+    manifest = {
+        "format": fmt,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "rows": performance.num_rows,
+        "districts": district_table.num_rows,
+    }
+    (directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def _read_table(directory: Path, name: str) -> pa.Table:
+    # The most recently written format wins if both are present
+    paths = [p for p in (directory / f"{name}.{fmt}" for fmt in SNAPSHOT_FORMATS) if p.exists()]
+    if not paths:
+        raise FileNotFoundError(f"No {name} table in snapshot {directory}")
+    path = max(paths, key=lambda p: p.stat().st_mtime)
+    if path.suffix == ".arrow":
+        table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    else:
+        table = pq.read_table(path)
+    # Zero-copy when the file holds a single record batch
+    return table.combine_chunks()
+
+
+def _numpy(table: pa.Table, name: str) -> np.ndarray:
+    column = table.column(name)
+    if column.num_chunks == 0:
+        return np.empty(0, dtype=column.type.to_pandas_dtype())
+    return column.chunk(0).to_numpy(zero_copy_only=False)
+
+
+def _runs(values: pa.ChunkedArray) -> Dict[str, Tuple[int, int]]:
+    """(start, stop) of each run of equal values in a sorted string column."""
+    n = len(values)
+    if n == 0:
+        return {}
+    changed = pc.not_equal(values[1:], values[:-1]).to_numpy(zero_copy_only=False)
+    starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+    stops = np.append(starts[1:], n)
+    keys = values.take(pa.array(starts)).to_pylist()
+    return {key: (int(start), int(stop)) for key, start, stop in zip(keys, starts, stops)}
+
+
+class PerformanceSnapshot:
+    """Read-only view of a snapshot directory.
+
+    Rows are sorted by district and period, so a district is a contiguous
+    slice and a state is a few of them: one for the codes sharing its prefix,
+    plus one per district coded otherwise (e.g. numeric LGD codes), whose
+    state comes from the district table. Lookups narrow to those slices with
+    a dict lookup, filter the period column with numpy and only turn the
+    matching rows into Python objects.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        manifest_path = self.directory / "manifest.json"
+        self.manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+        self.performance = _read_table(self.directory, "performance")
+        self.district_table = _read_table(self.directory, "districts")
+        self.period = _numpy(self.performance, "period")
+        self.metrics = {m: _numpy(self.performance, m) for m in METRIC_COLUMNS}
+        self.district_ranges = _runs(self.performance.column("district_code"))
+        listed = self.district_table.select(["district_code", "state_code"]).to_pydict()
+        district_states = dict(zip(listed["district_code"], listed["state_code"]))
+        # state -> (start, stop) slices in district order, adjacent ones merged
+        self.state_ranges: Dict[str, List[Tuple[int, int]]] = {}
+        for code, (start, stop) in self.district_ranges.items():
+            state = district_states.get(code) or _state_prefix(code)
+            if not state:
+                continue
+            ranges = self.state_ranges.setdefault(state, [])
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], stop)
+            else:
+                ranges.append((start, stop))
+        self.district_state_ranges = _runs(self.district_table.column("state_code"))
+
+    @property
+    def num_rows(self) -> int:
+        return self.performance.num_rows
+
+    def rows(self, indices: Sequence[int], columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Rows at `indices` (in that order) as PerformanceData-shaped dicts."""
+        if len(indices) == 0:
+            return []
+        indices = np.asarray(indices, dtype=np.int64)
+        selected = self.performance.select(columns or ROW_COLUMNS)
+        first = int(indices[0])
+        if indices[-1] - first == len(indices) - 1 and np.all(np.diff(indices) == 1):
+            # A run of consecutive rows (the usual history window) needs no gather
+            return selected.slice(first, len(indices)).to_pylist()
+        return selected.take(pa.array(indices)).to_pylist()
+
+    def district_codes(self) -> List[str]:
+        return [d["district_code"] for d in self.district_table.select(["district_code"]).to_pylist()]
+
+    def districts(self, state_code: Optional[str] = None) -> List[Dict[str, Any]]:
+        """A state's districts by name, or every district without a state."""
+        if state_code is None:
+            start, stop = 0, self.district_table.num_rows
+        else:
+            start, stop = self.district_state_ranges.get(state_code, (0, 0))
+        # Fields a source document did not have come back absent, not None
+        return [
+            {k: v for k, v in d.items() if v is not None}
+            for d in self.district_table.slice(start, stop - start).to_pylist()
+        ]
+
+    def window(self, district_code: str, periods: List[Tuple[int, int]]) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """Rows of one district for the given (month, year) periods."""
+        start, stop = self.district_ranges.get(district_code, (0, 0))
+        wanted = np.array([period_index(m, y) for m, y in periods], dtype=np.int32)
+        hits = np.flatnonzero(np.isin(self.period[start:stop], wanted)) + start
+        return {(row["month"], row["year"]): row for row in self.rows(hits)}
+
+    def month(self, district_codes: List[str], month: int, year: int) -> Dict[str, Dict[str, Any]]:
+        """One month's row for each of `district_codes` that has one."""
+        target = period_index(month, year)
+        hits = []
+        for code in district_codes:
+            start, stop = self.district_ranges.get(code, (0, 0))
+            # Periods are sorted within a district
+            i = start + int(np.searchsorted(self.period[start:stop], target))
+            if i < stop and self.period[i] == target:
+                hits.append(i)
+        return {row["district_code"]: row for row in self.rows(hits)}
+
+    def _sums(self, idx: np.ndarray, summed: Sequence[str]) -> Dict[str, Any]:
+        if len(idx) == 0:
+            return {"average_wage_sum": 0, "totals": {m: 0 for m in summed}}
+        return {
+            "average_wage_sum": self.metrics["average_wage"][idx].sum().item(),
+            "totals": {m: self.metrics[m][idx].sum().item() for m in summed},
+        }
+
+    def _state_indices(self, state_code: str, keep) -> np.ndarray:
+        """Row indices of a state's districts whose periods pass `keep` (a
+        function of a period array returning a mask), in district order."""
+        parts = [
+            np.flatnonzero(keep(self.period[start:stop])) + start
+            for start, stop in self.state_ranges.get(state_code, [])
+        ]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def state_month_indices(self, state_code: str, month: int, year: int) -> np.ndarray:
+        """Row indices of a state's districts for one month, in district order."""
+        target = period_index(month, year)
+        return self._state_indices(state_code, lambda periods: periods == target)
+
+    def state_totals(self, state_code: str, month: int, year: int, summed: Sequence[str]) -> Dict[str, Any]:
+        """Same shape as a state_monthly_rollups document."""
+        idx = self.state_month_indices(state_code, month, year)
+        return {"districts_reporting": int(len(idx)), **self._sums(idx, summed)}
+
+    def metric_values(self, metric: str, idx: np.ndarray) -> np.ndarray:
+        if metric == "budget_utilization":
+            allocated = self.metrics["budget_allocated"][idx]
+            spent = self.metrics["budget_spent"][idx]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(allocated > 0, spent / allocated * 100, 0.0)
+        return self.metrics[metric][idx]
+
+    def rankings(self, state_code: str, metric: str, month: int, year: int, ascending: bool = False) -> List[Dict[str, Any]]:
+        idx = self.state_month_indices(state_code, month, year)
+        values = self.metric_values(metric, idx)
+        # Stable sort over district order breaks ties by district_code
+        order = np.argsort(values if ascending else -values, kind="stable")
+        codes = self.performance.column("district_code").take(pa.array(idx[order])).to_pylist()
+        return [
+            {"district_code": code, "value": value, "rank": rank}
+            for rank, (code, value) in enumerate(zip(codes, values[order].tolist()), start=1)
+        ]
+
+    def fiscal_year_totals(self, district_code: str, fiscal_year: int, summed: Sequence[str]) -> Dict[str, Any]:
+        """Same shape as a district_fy_totals document."""
+        start, stop = self.district_ranges.get(district_code, (0, 0))
+        periods = self.period[start:stop]
+        first = period_index(4, fiscal_year)
+        idx = np.flatnonzero((periods >= first) & (periods < first + 12)) + start
+        return {"months_reporting": int(len(idx)), **self._sums(idx, summed)}
+
+    def iter_state_rows(
+        self,
+        state_code: str,
+        start: Optional[Tuple[int, int]],
+        end: Optional[Tuple[int, int]],
+        columns: List[str],
+        batch_size: int = 1000,
+    ) -> Iterator[Dict[str, Any]]:
+        """A state's rows between two (month, year) periods inclusive, in
+        district and period order, materialized `batch_size` at a time."""
+        first = period_index(*start) if start else None
+        last = period_index(*end) if end else None
+
+        def keep(periods: np.ndarray) -> np.ndarray:
+            mask = np.ones(len(periods), dtype=bool)
+            if first is not None:
+                mask &= periods >= first
+            if last is not None:
+                mask &= periods <= last
+            return mask
+
+        idx = self._state_indices(state_code, keep)
+        for i in range(0, len(idx), batch_size):
+            yield from self.rows(idx[i:i + batch_size], columns)
@@ -0,0 +1,77 @@
+"""Nearest-neighbour lookup over geographic points.
+
+Points are stored as unit vectors on the sphere, where straight-line (chord)
+distance grows with great-circle distance, so an ordinary 3-d KD-tree gives
+exact k-nearest results without special cases at the antimeridian. The tree
+is implicit: points are ordered so that every [lo, hi) range is split at its
+middle element, on the axis of that depth.
+"""
+import heapq
+import math
+from typing import List, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lon)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class SpatialIndex:
+    """Static KD-tree over (lat, lon) points; build a new one to update."""
+
+    def __init__(self, points: Sequence[Tuple[float, float]]):
+        vectors = [unit_vector(lat, lon) for lat, lon in points]
+        order = list(range(len(vectors)))
+        self._build(vectors, order, 0, len(order), 0)
+        # Points in tree order, with their positions in the input
+        self._vectors = [vectors[i] for i in order]
+        self._ids = order
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @classmethod
+    def _build(cls, vectors, order: List[int], lo: int, hi: int, axis: int):
+        if hi - lo <= 1:
+            return
+        order[lo:hi] = sorted(order[lo:hi], key=lambda i: vectors[i][axis])
+        mid = (lo + hi) // 2
+        cls._build(vectors, order, lo, mid, (axis + 1) % 3)
+        cls._build(vectors, order, mid + 1, hi, (axis + 1) % 3)
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[int, float]]:
+        """Up to k (input position, distance in km) pairs, closest first."""
+        if k <= 0 or not self._ids:
+            return []
+        target = unit_vector(lat, lon)
+        # Max-heap of (-squared chord, tree position) holding the best k so far
+        best: List[Tuple[float, int]] = []
+        # (lo, hi, axis, squared distance from the target to that range's cell)
+        stack = [(0, len(self._ids), 0, 0.0)]
+        while stack:
+            lo, hi, axis, bound = stack.pop()
+            # The range can only help if its cell is closer than the k-th best
+            if lo >= hi or (len(best) == k and bound >= -best[0][0]):
+                continue
+            mid = (lo + hi) // 2
+            point = self._vectors[mid]
+            d2 = sum((a - b) ** 2 for a, b in zip(point, target))
+            if len(best) < k:
+                heapq.heappush(best, (-d2, mid))
+            elif d2 < -best[0][0]:
+                heapq.heapreplace(best, (-d2, mid))
+            delta = target[axis] - point[axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if delta < 0 else ((mid + 1, hi), (lo, mid))
+            next_axis = (axis + 1) % 3
+            # Near side first (pushed last); the far side is checked again
+            # when popped, against the then-current k-th best
+            stack.append((*far, next_axis, max(bound, delta * delta)))
+            stack.append((*near, next_axis, bound))
+        ranked = sorted((-neg_d2, pos) for neg_d2, pos in best)
+        return [(self._ids[pos], chord_to_km(math.sqrt(d2))) for d2, pos in ranked]
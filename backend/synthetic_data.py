@@ -0,0 +1,243 @@
+"""Deterministic synthetic MGNREGA performance data.
+
+Every value is derived from a stable hash of (district_code, month, year,
+field), so the same key yields the same numbers in every process, on every
+machine, whether it is generated one record at a time on a request path or
+in bulk with NumPy for load testing.
+
+Usage (from the backend directory):
+    python synthetic_data.py --states UP,MH --months 24
+    python synthetic_data.py --states all --districts-per-state 75 --months 120
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("synthetic_data")
+
+MASK64 = (1 << 64) - 1
+
+# field -> (low, high, scale); values are drawn as integers in [low, high]
+# and divided by `scale`, so currency fields keep exactly two decimals
+FIELD_RANGES: Dict[str, Tuple[int, int, int]] = {
+    "total_workers": (5000, 50000, 1),
+    "work_completed": (50, 200, 1),
+    "work_ongoing": (10, 100, 1),
+    "average_wage": (18000, 25000, 100),
+    "budget_allocated": (1_000_000_000, 5_000_000_000, 100),
+    "budget_spent": (500_000_000, 4_500_000_000, 100),
+    "person_days_generated": (100000, 500000, 1),
+}
+
+_PERIOD_MULT = 0x100000001B3
+_FIELD_MULT = 0xD6E8FEB86659FD93
+
+# Stable ids for generated rows (uuid5 is deterministic, unlike uuid4)
+ID_NAMESPACE = uuid.UUID("5d0f9a4e-6c1b-4d8e-9b63-2f4c1a7e8b90")
+
+
+def stable_hash(text: str) -> int:
+    """64-bit hash that, unlike hash(), does not change between processes."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _splitmix64(x: int) -> int:
+    z = (x + 0x9E3779B97F4A7C15) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def _splitmix64_np(x: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        z = x + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def mock_performance_values(district_code: str, month: int, year: int) -> Dict[str, Any]:
+    """Generate one record's metrics; identical to the bulk generator's row."""
+    base = stable_hash(district_code)
+    period_key = ((year * 12 + month - 1) * _PERIOD_MULT) & MASK64
+    values: Dict[str, Any] = {}
+    for i, (field, (low, high, scale)) in enumerate(FIELD_RANGES.items()):
+        x = base ^ period_key ^ (((i + 1) * _FIELD_MULT) & MASK64)
+        u = (_splitmix64(x) >> 11) * (1.0 / (1 << 53))
+        drawn = low + int(u * (high - low + 1))
+        values[field] = drawn if scale == 1 else drawn / scale
+    return values
+
+
+def generate_performance_columns(
+    district_codes: Sequence[str],
+    periods: Sequence[Tuple[int, int]],
+) -> Dict[str, np.ndarray]:
+    """Generate the full districts x periods dataset as NumPy columns.
+
+    Rows are ordered district-major: all periods of the first district, then
+    the next one.
+    """
+    codes = np.asarray(district_codes, dtype=object)
+    months = np.fromiter((m for m, _ in periods), dtype=np.int64, count=len(periods))
+    years = np.fromiter((y for _, y in periods), dtype=np.int64, count=len(periods))
+
+    bases = np.fromiter((stable_hash(c) for c in district_codes), dtype=np.uint64, count=len(codes))
+    with np.errstate(over="ignore"):
+        period_keys = (years * 12 + months - 1).astype(np.uint64) * np.uint64(_PERIOD_MULT)
+    # Broadcast to a (districts, periods) grid and flatten district-major
+    keys = (bases[:, None] ^ period_keys[None, :]).ravel()
+
+    columns: Dict[str, np.ndarray] = {
+        "district_code": np.repeat(codes, len(periods)),
+        "month": np.tile(months, len(codes)),
+        "year": np.tile(years, len(codes)),
+    }
+    for i, (field, (low, high, scale)) in enumerate(FIELD_RANGES.items()):
+        with np.errstate(over="ignore"):
+            x = keys ^ np.uint64(((i + 1) * _FIELD_MULT) & MASK64)
+        u = (_splitmix64_np(x) >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+        drawn = low + np.floor(u * (high - low + 1)).astype(np.int64)
+        columns[field] = drawn if scale == 1 else drawn / scale
+    return columns
+
+
+def iter_documents(
+    columns: Dict[str, np.ndarray],
+    batch_size: int = 10000,
+    timestamp: Optional[datetime] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield batches of performance_data documents built from the columns."""
+    timestamp = timestamp or datetime.now(timezone.utc)
+    total = len(columns["district_code"])
+    fields = list(columns)
+    for start in range(0, total, batch_size):
+        stop = min(start + batch_size, total)
+        # tolist() converts to native Python ints/floats in one pass
+        chunk = {f: columns[f][start:stop].tolist() for f in fields}
+        batch = []
+        for row in zip(*(chunk[f] for f in fields)):
+            doc = dict(zip(fields, row))
+            doc["id"] = str(uuid.uuid5(ID_NAMESPACE, f"{doc['district_code']}:{doc['year']}:{doc['month']}"))
+            doc["timestamp"] = timestamp
+            batch.append(doc)
+        yield batch
+
+
+def synthetic_district_codes(state_codes: Sequence[str], districts_per_state: Optional[int]) -> List[str]:
+    """District codes for the given states.
+
+    Without `districts_per_state` the known districts from states_data are
+    used; otherwise codes are generated as <STATE><NN> (e.g. UP01..UP75).
+    """
+    from states_data import STATE_DISTRICTS
+
+    codes: List[str] = []
+    for state in state_codes:
+        if districts_per_state:
+            width = max(2, len(str(districts_per_state)))
+            codes.extend(f"{state}{i:0{width}d}" for i in range(1, districts_per_state + 1))
+        else:
+            codes.extend(d["district_code"] for d in STATE_DISTRICTS.get(state, []))
+    return codes
+
+
+def period_range(months: int, end: Optional[Tuple[int, int]] = None) -> List[Tuple[int, int]]:
+    """`months` consecutive (month, year) periods ending at `end`, oldest first."""
+    if end is None:
+        now = datetime.now(timezone.utc)
+        end = (now.month, now.year)
+    last = end[1] * 12 + end[0] - 1
+    return [((i % 12) + 1, i // 12) for i in range(last - months + 1, last + 1)]
+
+
+async def seed_mongo(
+    district_codes: Sequence[str],
+    periods: Sequence[Tuple[int, int]],
+    batch_size: int = 10000,
+    concurrency: int = 4,
+    rebuild_rollups: bool = True,
+) -> int:
+    """Write the generated dataset with unordered bulk upserts, in the
+    configured storage layout."""
+    from pymongo import ReplaceOne
+    from server import BUCKETED_STORAGE, PERFORMANCE_KEY_FIELDS, db, performance_bucket_ops
+    from rollups import rebuild
+
+    columns = generate_performance_columns(district_codes, periods)
+    semaphore = asyncio.Semaphore(concurrency)
+    written = 0
+
+    async def write(batch: List[Dict[str, Any]]):
+        nonlocal written
+        async with semaphore:
+            if BUCKETED_STORAGE:
+                await db.performance_buckets.bulk_write(performance_bucket_ops(batch), ordered=False)
+            else:
+                await db.performance_data.bulk_write([
+                    ReplaceOne({f: d[f] for f in PERFORMANCE_KEY_FIELDS}, d, upsert=True)
+                    for d in batch
+                ], ordered=False)
+        written += len(batch)
+
+    pending = set()
+    for batch in iter_documents(columns, batch_size):
+        pending.add(asyncio.ensure_future(write(batch)))
+        if len(pending) >= concurrency * 2:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+    for task in asyncio.as_completed(pending):
+        await task
+
+    if rebuild_rollups:
+        await rebuild()
+    return written
+
+
+def main():
+    from states_data import INDIAN_STATES
+
+    parser = argparse.ArgumentParser(description="Seed MongoDB with deterministic synthetic performance data")
+    parser.add_argument('--states', default='UP', help="comma-separated state codes, or 'all'")
+    parser.add_argument('--districts-per-state', type=int, default=None,
+                        help="generate this many districts per state instead of the known list")
+    parser.add_argument('--months', type=int, default=24)
+    parser.add_argument('--end', default=None, help="last month as YYYY-MM (default: current month)")
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--skip-rollups', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.states.lower() == 'all':
+        states = [s["code"] for s in INDIAN_STATES]
+    else:
+        states = [s.strip().upper() for s in args.states.split(',') if s.strip()]
+    end = None
+    if args.end:
+        year, month = args.end.split('-')
+        end = (int(month), int(year))
+
+    codes = synthetic_district_codes(states, args.districts_per_state)
+    periods = period_range(args.months, end)
+    started = time.perf_counter()
+    written = asyncio.run(seed_mongo(
+        codes, periods,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        rebuild_rollups=not args.skip_rollups,
+    ))
+    logger.info(f"Wrote {written} rows for {len(codes)} districts x {len(periods)} months "
+                f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
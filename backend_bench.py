@@ -0,0 +1,300 @@
+"""Offline latency/throughput benchmark for the FastAPI app in backend/server.py.
+
+Runs every GET route under /api in-process through httpx's ASGI transport,
+with local stand-ins for the external services:
+
+- MongoDB: mongomock-motor (in-memory), or a local mongod via --mongo-url
+- Redis: fakeredis, or a local redis via --redis-url
+- data.gov.in: an httpx.MockTransport serving synthetic records
+
+Scenarios:
+- cold: empty database and caches, every request hits a new key (routes in
+  SEEDED_ROUTES start from one seeded month of rows instead)
+- warm: caches primed, sequential requests
+- concurrent: caches primed, many requests in flight at once
+
+Results (throughput and p50/p95/p99 per route and scenario) are written as
+JSON so runs from different commits can be compared with --compare.
+
+Usage:
+    pip install -r backend/requirements-bench.txt
+    python backend_bench.py
+    python backend_bench.py --requests 500 --concurrency 64 --output bench_output.json
+    python backend_bench.py --compare previous.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).parent
+sys.path.insert(0, str(ROOT / 'backend'))
+# server.py refuses to import without a connection string; the bench swaps
+# the client out before any request is made
+os.environ.setdefault('MONGO_URL', 'mongodb://127.0.0.1:27017')
+
+import httpx  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+
+import server  # noqa: E402
+from synthetic_data import period_range, seed_mongo, synthetic_district_codes  # noqa: E402
+
+# Values for path and required query parameters, by parameter name
+PATH_PARAMS = {
+    'state_code': 'UP',
+}
+QUERY_PARAMS: Dict[str, Any] = {
+    'state_code': 'UP',
+    'q': 'ag',
+    'lat': 26.85,
+    'lon': 80.95,
+}
+# Read-only routes that would 404 on an empty database; they are benchmarked
+# against the current month's rows for every district
+SEEDED_ROUTES = {'/api/district/{district_code}/rank'}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(latencies: List[float], errors: int, wall: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    n = len(ordered)
+    return {
+        'requests': n,
+        'errors': errors,
+        'throughput_rps': round(n / wall, 1) if wall > 0 else 0.0,
+        'mean_ms': round(sum(ordered) / n * 1000, 3) if n else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+    }
+
+
+def api_routes() -> List[APIRoute]:
+    routes = []
+    for route in server.app.routes:
+        if isinstance(route, APIRoute) and route.path.startswith('/api') and 'GET' in route.methods:
+            routes.append(route)
+    return routes
+
+
+def build_url(route: APIRoute, district_code: str) -> Optional[str]:
+    """Fill path parameters; None when the route needs a value we do not know."""
+    path = route.path
+    for param in route.dependant.path_params:
+        value = district_code if param.name == 'district_code' else PATH_PARAMS.get(param.name)
+        if value is None:
+            return None
+        path = path.replace('{' + param.name + '}', str(value))
+    query = {}
+    for param in route.dependant.query_params:
+        if param.name in QUERY_PARAMS:
+            query[param.name] = QUERY_PARAMS[param.name]
+        elif param.required:
+            return None
+    if query:
+        path = f"{path}?{httpx.QueryParams(query)}"
+    return path
+
+
+class Stubs:
+    """Owns the stand-in services and swaps them into the server module."""
+
+    def __init__(self, mongo_url: Optional[str], redis_url: Optional[str], upstream_latency: float):
+        self.mongo_url = mongo_url
+        self.redis_url = redis_url
+        self.upstream_latency = upstream_latency
+
+    async def _upstream(self, request: httpx.Request) -> httpx.Response:
+        if self.upstream_latency:
+            await asyncio.sleep(self.upstream_latency)
+        params = request.url.params
+        record = server.generate_mock_performance_data(
+            params.get('filters[district_code]', 'UP01'),
+            int(params.get('filters[month]', 1)),
+            int(params.get('filters[year]', 2024)),
+        )
+        return httpx.Response(200, json={'total': 1, 'records': [record]})
+
+    async def start(self):
+        if self.mongo_url:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            server.client = AsyncIOMotorClient(self.mongo_url)
+        else:
+            from mongomock_motor import AsyncMongoMockClient
+            server.client = AsyncMongoMockClient()
+        server.db = server.client['mgnrega_bench']
+
+        if self.redis_url:
+            import redis.asyncio as redis
+            server.redis_client = redis.from_url(self.redis_url, decode_responses=False)
+        else:
+            import fakeredis.aioredis
+            server.redis_client = fakeredis.aioredis.FakeRedis(decode_responses=False)
+
+        server.USE_DATA_GOV = True
+        server.http_client = httpx.AsyncClient(transport=httpx.MockTransport(self._upstream))
+        await self.reset()
+        self.listener = asyncio.create_task(server.listen_for_invalidations())
+
+    async def reset(self):
+        """Drop all data and cached values."""
+        for name in await server.db.list_collection_names():
+            await server.db[name].drop()
+        await server.redis_client.flushdb()
+        server.local_cache.clear()
+        server.rank_engine.clear()
+        await server.ensure_indexes()
+
+    async def stop(self):
+        self.listener.cancel()
+        await server.http_client.aclose()
+        if self.mongo_url or self.redis_url:
+            await self.reset()
+
+
+async def run_requests(client: httpx.AsyncClient, urls: List[str], concurrency: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(url: str):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                resp = await client.get(url)
+                await resp.aread()
+                ok = resp.status_code < 400
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(u) for u in urls))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    stubs = Stubs(args.mongo_url, args.redis_url, args.upstream_latency_ms / 1000)
+    await stubs.start()
+    codes = synthetic_district_codes(['UP', 'MH', 'KA', 'TN', 'RJ', 'GJ', 'WB', 'BR', 'MP'], 75)
+    routes = [(r, r.path) for r in api_routes()]
+    results: Dict[str, Dict[str, Any]] = {'cold': {}, 'warm': {}, 'concurrent': {}}
+    skipped = []
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        for route, name in routes:
+            if build_url(route, codes[0]) is None:
+                skipped.append(name)
+                continue
+
+            # Cold: every request is a cache and database miss on a new key
+            await stubs.reset()
+            if name in SEEDED_ROUTES:
+                await seed_mongo(codes, period_range(1))
+            n_cold = min(args.requests, len(codes))
+            cold_urls = [build_url(route, code) for code in codes[:n_cold]]
+            results['cold'][name] = await run_requests(client, cold_urls, 1)
+
+            # Warm: a small, primed key set served sequentially
+            hot = codes[:args.hot_keys]
+            await run_requests(client, [build_url(route, c) for c in hot], args.concurrency)
+            warm_urls = [build_url(route, hot[i % len(hot)]) for i in range(args.requests)]
+            results['warm'][name] = await run_requests(client, warm_urls, 1)
+
+            # Concurrent: the same primed keys under many in-flight requests
+            results['concurrent'][name] = await run_requests(client, warm_urls, args.concurrency)
+            print(f"{name:<45} cold p95={results['cold'][name]['p95_ms']:>9.2f}ms "
+                  f"warm p95={results['warm'][name]['p95_ms']:>8.2f}ms "
+                  f"concurrent {results['concurrent'][name]['throughput_rps']:>8.1f} rps")
+
+    await stubs.stop()
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'mongo': args.mongo_url or 'mongomock',
+            'redis': args.redis_url or 'fakeredis',
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'hot_keys': args.hot_keys,
+            'upstream_latency_ms': args.upstream_latency_ms,
+            'skipped_routes': skipped,
+        },
+        'results': results,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """Print p95 changes against a baseline run; returns the number of regressions."""
+    regressions = 0
+    print(f"\nComparing against {baseline['meta'].get('commit')} (p95, regression threshold {threshold:.0%})")
+    for scenario, routes in current['results'].items():
+        for name, stats in routes.items():
+            before = baseline['results'].get(scenario, {}).get(name)
+            if not before or not before['p95_ms']:
+                continue
+            change = stats['p95_ms'] / before['p95_ms'] - 1
+            flag = ''
+            if change > threshold:
+                regressions += 1
+                flag = '  <-- regression'
+            print(f"{scenario:<11} {name:<45} {before['p95_ms']:>9.2f} -> {stats['p95_ms']:>9.2f}ms "
+                  f"({change:+.1%}){flag}")
+    return regressions
+
+
+def main():
+    # One INFO line per stubbed upstream call would drown the report
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(description="Offline benchmark for the MGNREGA API")
+    parser.add_argument('--requests', type=int, default=200, help="requests per route and scenario")
+    parser.add_argument('--concurrency', type=int, default=32, help="in-flight requests in the concurrent scenario")
+    parser.add_argument('--hot-keys', type=int, default=10, help="distinct districts in the warm scenarios")
+    parser.add_argument('--upstream-latency-ms', type=float, default=50.0, help="simulated data.gov.in latency")
+    parser.add_argument('--mongo-url', default=None, help="use a local mongod instead of mongomock")
+    parser.add_argument('--redis-url', default=None, help="use a local redis instead of fakeredis")
+    parser.add_argument('--output', type=Path, default=ROOT / 'bench_output.json')
+    parser.add_argument('--compare', type=Path, default=None, help="baseline JSON from an earlier run")
+    parser.add_argument('--threshold', type=float, default=0.2, help="p95 slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+    args.output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding='utf-8'))
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
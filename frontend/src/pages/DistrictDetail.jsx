@@ -37,15 +37,13 @@ const DistrictDetail = () => {
   const fetchAllData = async () => {
     setLoading(true);
     try {
-      const [currentRes, historyRes, compareRes] = await Promise.all([
-        axios.get(`${API}/district/${districtCode}/current`),
-        axios.get(`${API}/district/${districtCode}/history?months=6`),
-        axios.get(`${API}/district/${districtCode}/compare`)
-      ]);
+      const res = await axios.get(`${API}/district/${districtCode}/dashboard?months=6`);
 
-      if (currentRes.data.success) setCurrentData(currentRes.data.data);
-      if (historyRes.data.success) setHistoricalData(historyRes.data.data);
-      if (compareRes.data.success) setComparison(compareRes.data.data);
+      if (res.data.success) {
+        setCurrentData(res.data.data.current);
+        setHistoricalData(res.data.data.history);
+        setComparison(res.data.data.comparison);
+      }
     } catch (error) {
       console.error('Error fetching data:', error);
       toast.error('Failed to load district data');
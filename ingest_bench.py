@@ -0,0 +1,70 @@
+"""Micro-benchmark: per-record vs vectorized parsing of data.gov.in pages.
+
+Generates synthetic upstream pages (tests/ingest_pages.py: mixed field
+aliases, numbers as strings, month names, financial-year-only rows and a
+share of unusable records) and times backend/ingest.py's two parsers over
+them:
+
+- per-record: parse_records, i.e. resolve_record_key + map_data_gov_record
+  + PerformanceData for every record
+- vectorized: parse_page, a compiled field mapping applied column-wise
+
+That both produce the same rows is checked by tests/test_ingest_parse.py.
+
+Usage:
+    python ingest_bench.py
+    python ingest_bench.py --records 200000 --page-size 1000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).parent
+sys.path.insert(0, str(ROOT / 'backend'))
+# ingest imports server, which refuses to import without a connection string;
+# nothing here touches the database
+os.environ.setdefault('MONGO_URL', 'mongodb://127.0.0.1:27017')
+
+from ingest import parse_page, parse_records  # noqa: E402
+from tests.ingest_pages import make_pages  # noqa: E402
+
+
+def per_record(page: List[Dict[str, Any]], stats: Dict[str, int]) -> List[Dict[str, Any]]:
+    return list(parse_records(page, stats))
+
+
+def run(parser: Callable, pages: List[List[Dict[str, Any]]]):
+    stats = {'skipped': 0}
+    started = time.perf_counter()
+    rows = [row for page in pages for row in parser(page, stats)]
+    return time.perf_counter() - started, rows, stats['skipped']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-record vs vectorized ingestion parsing")
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per parser; the best is reported")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    pages = make_pages(args.records, args.page_size, args.seed)
+    results = {}
+    for name, fn in (('per-record', per_record), ('vectorized', parse_page)):
+        best = None
+        for _ in range(args.repeat):
+            elapsed, rows, skipped = run(fn, pages)
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = (best, rows, skipped)
+        print(f"{name:<11} {best * 1000:>9.1f} ms  {args.records / best:>12,.0f} records/s  "
+              f"rows={len(rows)} skipped={skipped}")
+
+    slow, fast = results['per-record'], results['vectorized']
+    print(f"speedup     {slow[0] / fast[0]:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
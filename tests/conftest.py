@@ -0,0 +1,38 @@
+"""Make the backend modules importable and give tests in-memory stores.
+
+server.py needs MONGO_URL at import time; nothing connects to it, because
+the `stores` fixture swaps in mongomock-motor and fakeredis (both listed in
+backend/requirements-bench.txt).
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'backend'))
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('MONGO_URL', 'mongodb://127.0.0.1:27017')
+
+
+@pytest.fixture
+def stores(monkeypatch):
+    """The server module backed by an empty in-memory database and Redis."""
+    mongomock_motor = pytest.importorskip('mongomock_motor')
+    fakeredis = pytest.importorskip('fakeredis')
+    import ingest
+    import rollups
+    import server
+
+    client = mongomock_motor.AsyncMongoMockClient()
+    db = client['mgnrega_test']
+    monkeypatch.setattr(server, 'client', client)
+    for module in (server, ingest, rollups):
+        monkeypatch.setattr(module, 'db', db)
+    monkeypatch.setattr(server, 'redis_client', fakeredis.aioredis.FakeRedis(decode_responses=False))
+    server.local_cache.clear()
+    server.rank_engine.clear()
+    yield server
+    server.local_cache.clear()
+    server.rank_engine.clear()
@@ -0,0 +1,65 @@
+"""Synthetic data.gov.in pages for the ingestion parser tests and ingest_bench.py.
+
+Pages mix the field aliases of a few resource layouts, numbers as strings,
+month names, financial-year-only rows and a share of unusable records.
+"""
+import random
+from typing import Any, Dict, List
+
+MONTH_LABELS = ['Jan', 'February', 'mar', 'April', 'May', 'Jun', 'July', 'aug', 'Sept', 'Oct', 'Nov', 'December']
+
+# Field names of a few resource layouts, as the alias lists allow them
+LAYOUTS = [
+    {
+        'district_code': 'district_code', 'month': 'month', 'year': 'year',
+        'total_workers': 'total_workers', 'work_completed': 'work_completed',
+        'work_ongoing': 'work_ongoing', 'average_wage': 'average_wage',
+        'budget_allocated': 'budget_allocated', 'budget_spent': 'budget_spent',
+        'person_days_generated': 'person_days_generated',
+    },
+    {
+        'district_code': 'district_cd', 'month': 'month_no', 'year': 'fin_year',
+        'total_workers': 'households_worked', 'work_completed': 'completed_works',
+        'work_ongoing': 'ongoing_works', 'average_wage': 'wage_avg',
+        'budget_allocated': 'funds_allocated', 'budget_spent': 'expenditure',
+        'person_days_generated': 'persondays',
+    },
+]
+
+
+def make_record(rng: random.Random, layout: Dict[str, str]) -> Dict[str, Any]:
+    month = rng.randint(1, 12)
+    year = rng.randint(2018, 2025)
+    rec: Dict[str, Any] = {
+        layout['district_code']: f"up{rng.randint(1, 75):02d}" if rng.random() < 0.5 else rng.randint(100, 999),
+        layout['month']: MONTH_LABELS[month - 1] if rng.random() < 0.3 else str(month),
+        layout['year']: f"{year}-{year + 1}" if layout['year'] == 'fin_year' else year,
+        layout['total_workers']: str(rng.randint(5000, 50000)),
+        layout['work_completed']: rng.randint(50, 200),
+        layout['work_ongoing']: f" {rng.randint(10, 100)} ",
+        layout['average_wage']: f"{rng.uniform(180, 250):.4f}",
+        layout['budget_allocated']: rng.uniform(1e7, 5e7),
+        layout['budget_spent']: str(round(rng.uniform(5e6, 4.5e7), 3)),
+        layout['person_days_generated']: rng.randint(100000, 500000),
+        'state_name': 'Uttar Pradesh',
+        'remarks': '',
+    }
+    roll = rng.random()
+    if roll < 0.02:
+        rec[layout['month']] = 'n/a'
+    elif roll < 0.04:
+        rec.pop(layout['district_code'])
+    elif roll < 0.06:
+        rec[layout['average_wage']] = 'NA'
+    elif roll < 0.08:
+        rec[layout['budget_spent']] = ''
+    return rec
+
+
+def make_pages(n_records: int, page_size: int, seed: int) -> List[List[Dict[str, Any]]]:
+    rng = random.Random(seed)
+    pages = []
+    for start in range(0, n_records, page_size):
+        layout = LAYOUTS[(start // page_size) % len(LAYOUTS)]
+        pages.append([make_record(rng, layout) for _ in range(min(page_size, n_records - start))])
+    return pages
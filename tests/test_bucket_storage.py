@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+import server
+from server import _bucket_match, fiscal_year_of
+
+
+@pytest.fixture
+def buckets(stores, monkeypatch):
+    monkeypatch.setattr(stores, 'BUCKETED_STORAGE', True)
+    asyncio.run(stores.ensure_indexes())
+    return stores
+
+
+def row(code, month, year, workers=100):
+    doc = server.new_performance_row({
+        **server.generate_mock_performance_data(code, month, year),
+        'total_workers': workers,
+    })
+    # MongoDB hands timestamps back as naive UTC, to the millisecond
+    ts = doc['timestamp']
+    doc['timestamp'] = ts.replace(microsecond=ts.microsecond // 1000 * 1000, tzinfo=None)
+    return doc
+
+
+# January to June 2024 spans fiscal years 2023-24 and 2024-25
+PERIODS = [(m, 2024) for m in range(1, 7)]
+
+
+def test_fiscal_year_boundary():
+    assert fiscal_year_of(3, 2024) == 2023
+    assert fiscal_year_of(4, 2024) == 2024
+    assert fiscal_year_of(12, 2024) == 2024
+    assert fiscal_year_of(1, 2025) == 2024
+
+
+def test_bucket_match():
+    assert _bucket_match({'district_code': 'UP01', 'month': 3, 'year': 2024}) == {'district_code': 'UP01', 'fiscal_year': 2023}
+    assert _bucket_match({'district_code': 'UP01', 'month': 4, 'year': 2024}) == {'district_code': 'UP01', 'fiscal_year': 2024}
+    query = {'district_code': 'UP01', '$or': [{'month': m, 'year': y} for m, y in PERIODS]}
+    assert _bucket_match(query) == {'district_code': 'UP01', 'fiscal_year': {'$in': [2023, 2024]}}
+    query = {'$or': [{'district_code': 'UP01', 'month': 3, 'year': 2024}, {'district_code': 'UP02', 'month': 4, 'year': 2024}]}
+    assert _bucket_match(query) == {'fiscal_year': {'$in': [2023, 2024]}}
+    # Otherwise per-district clauses keep their own bucket filters
+    query = {'$or': [{'district_code': 'UP01'}, {'district_code': 'UP02', 'month': 4, 'year': 2024}]}
+    assert _bucket_match(query) == {'$or': [
+        {'district_code': 'UP01'},
+        {'district_code': 'UP02', 'fiscal_year': 2024},
+    ]}
+    # Anything it cannot narrow falls back to the district alone
+    assert _bucket_match({'district_code': 'UP01', 'year': {'$gte': 2024}}) == {'district_code': 'UP01'}
+
+
+def test_round_trip_across_fiscal_years(buckets):
+    docs = [row('UP01', m, y, workers=m) for m, y in PERIODS] + [row('UP02', 3, 2024)]
+
+    async def run():
+        await server.upsert_performance_rows(docs)
+        stored = await server.db.performance_buckets.find({}, {'_id': 0}).sort([('district_code', 1), ('fiscal_year', 1)]).to_list(None)
+        query = {'district_code': 'UP01', '$or': [{'month': m, 'year': y} for m, y in PERIODS]}
+        read = [r async for r in server.iter_performance_rows(query, sort=True)]
+        window = await server.load_performance_window('UP01', [(3, 2024), (4, 2024)])
+        return stored, read, window
+
+    stored, read, window = asyncio.run(run())
+    assert [(b['district_code'], b['fiscal_year'], sorted(b['months'], key=int)) for b in stored] == [
+        ('UP01', 2023, ['1', '2', '3']),
+        ('UP01', 2024, ['4', '5', '6']),
+        ('UP02', 2023, ['3']),
+    ]
+    assert all(b['state_code'] == 'UP' for b in stored)
+    assert read == docs[:6]
+    assert window[(3, 2024)] == docs[2] and window[(4, 2024)] == docs[3]
+
+
+def test_upsert_keeps_existing_months(buckets):
+    async def run():
+        await server.upsert_performance_rows([row('UP01', 3, 2024, workers=1)])
+        # The March entry exists; April lands in the next fiscal year's bucket
+        await server.upsert_performance_rows([row('UP01', 3, 2024, workers=2), row('UP01', 4, 2024, workers=3)])
+        rows = [r async for r in server.iter_performance_rows({'district_code': 'UP01'}, sort=True)]
+        totals = await server.db.district_fy_totals.find({}, {'_id': 0}).sort('fiscal_year', 1).to_list(None)
+        return rows, totals
+
+    rows, totals = asyncio.run(run())
+    assert [(r['month'], r['total_workers']) for r in rows] == [(3, 1), (4, 3)]
+    # Only rows actually written reach the rollups
+    assert [(t['fiscal_year'], t['months_reporting'], t['totals']['total_workers']) for t in totals] == [(2023, 1, 1), (2024, 1, 3)]
+
+
+def test_bucket_ops_overwrite(buckets):
+    async def run():
+        await server.upsert_performance_rows([row('UP01', 3, 2024, workers=1)])
+        await server.db.performance_buckets.bulk_write(server.performance_bucket_ops([
+            row('UP01', 3, 2024, workers=5), row('UP01', 4, 2024, workers=6),
+        ]))
+        return [r async for r in server.iter_performance_rows({'district_code': 'UP01'}, sort=True)]
+
+    rows = asyncio.run(run())
+    assert [(r['month'], r['total_workers']) for r in rows] == [(3, 5), (4, 6)]
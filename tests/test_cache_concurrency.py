@@ -0,0 +1,156 @@
+import asyncio
+import json
+
+import pytest
+
+KEY = 'performance:UP01:1:2024'
+
+
+class Compute:
+    """A slow computation that counts its calls."""
+
+    def __init__(self, value=b'fresh', delay=0.05):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+@pytest.fixture
+def cache(stores):
+    stores._inflight.clear()
+    return stores
+
+
+def held_by_another_worker(server):
+    return server.redis_client.set(server.redis_key(f'lock:{KEY}'), 'other-worker', px=10000)
+
+
+def test_concurrent_misses_compute_once(cache):
+    server = cache
+    compute = Compute()
+
+    async def run():
+        values = await asyncio.gather(*(server.cache_get_or_set(KEY, 60, compute) for _ in range(20)))
+        lock = await server.redis_client.exists(server.redis_key(f'lock:{KEY}'))
+        return values, lock, await server.redis_client.get(server.redis_key(KEY))
+
+    values, lock, stored = asyncio.run(run())
+    assert compute.calls == 1
+    assert values == [b'fresh'] * 20
+    assert stored == b'fresh'
+    assert not lock and not server._inflight
+
+
+def test_locked_key_serves_the_stale_copy(cache):
+    server = cache
+    compute = Compute()
+
+    async def run():
+        await held_by_another_worker(server)
+        await server.redis_client.set(server.redis_key(f'stale:{KEY}'), b'stale')
+        return await server.cache_get_or_set(KEY, 60, compute)
+
+    assert asyncio.run(run()) == b'stale'
+    assert compute.calls == 0
+    # The stale copy is not promoted to the fresh key
+    assert server.local_cache.get(KEY) is None
+
+
+def test_locked_key_without_stale_copy_waits_for_the_holder(cache):
+    server = cache
+    compute = Compute()
+
+    async def holder():
+        await asyncio.sleep(0.2)
+        await server.redis_client.set(server.redis_key(KEY), b'from-holder')
+
+    async def run():
+        await held_by_another_worker(server)
+        writer = asyncio.ensure_future(holder())
+        value = await server.cache_get_or_set(KEY, 60, compute)
+        await writer
+        return value
+
+    assert asyncio.run(run()) == b'from-holder'
+    assert compute.calls == 0
+
+
+def test_locked_key_computes_when_the_holder_never_writes(cache, monkeypatch):
+    server = cache
+    monkeypatch.setattr(server, 'CACHE_LOCK_WAIT', 0.2)
+    compute = Compute()
+
+    async def run():
+        await held_by_another_worker(server)
+        value = await server.cache_get_or_set(KEY, 60, compute)
+        # The other worker's lock is left alone
+        return value, await server.redis_client.get(server.redis_key(f'lock:{KEY}'))
+
+    value, lock = asyncio.run(run())
+    assert value == b'fresh'
+    assert compute.calls == 1
+    assert lock == b'other-worker'
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_computation(cache):
+    server = cache
+    compute = Compute(delay=0.2)
+
+    async def run():
+        first = asyncio.ensure_future(server.cache_get_or_set(KEY, 60, compute))
+        second = asyncio.ensure_future(server.cache_get_or_set(KEY, 60, compute))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        value = await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return value, await server.redis_client.get(server.redis_key(KEY))
+
+    value, stored = asyncio.run(run())
+    assert value == stored == b'fresh'
+    assert compute.calls == 1
+
+
+def test_invalidations_from_other_workers_evict_l1(cache):
+    server = cache
+
+    async def until(condition):
+        for _ in range(100):
+            if await condition():
+                return True
+            await asyncio.sleep(0.01)
+        return False
+
+    async def subscribed():
+        channels = await server.redis_client.pubsub_numsub(server.CACHE_INVALIDATION_CHANNEL)
+        return channels[0][1] > 0
+
+    async def evicted():
+        return server.local_cache.get('other') is None
+
+    async def publish(key, worker):
+        await server.redis_client.publish(server.CACHE_INVALIDATION_CHANNEL, json.dumps({'key': key, 'worker': worker}))
+
+    async def run():
+        listener = asyncio.ensure_future(server.listen_for_invalidations())
+        try:
+            assert await until(subscribed)
+            for key in ('own', 'other', 'stale:other'):
+                server.local_cache.set(key, b'cached', 6, 60)
+            await publish('own', server.WORKER_ID)
+            await publish('other', 'other-worker')
+            assert await until(evicted)
+            # Messages are handled in order, so 'own' was seen before 'other'
+            return server.local_cache.get('own'), server.local_cache.get('stale:other')
+        finally:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+
+    own, stale = asyncio.run(run())
+    assert own == b'cached'
+    assert stale is None
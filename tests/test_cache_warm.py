@@ -0,0 +1,49 @@
+import asyncio
+
+
+def test_prebuild_month_builds_every_route_entry(stores, monkeypatch):
+    import synthetic_data
+    server = stores
+    monkeypatch.setattr(server, 'CACHE_WARM_HISTORY_MONTHS', [3, 6])
+    codes = ['UP01', 'UP02']
+    (month, year), = server.recent_periods(1)
+
+    async def run():
+        await server.db.districts.insert_many([{'district_code': code, 'district_name': code} for code in codes])
+        await synthetic_data.seed_mongo(codes, server.recent_periods(6))
+        built = await server.prebuild_month(month, year)
+        keys = [
+            key for code in codes for key in (
+                f"performance:{code}:{month}:{year}",
+                f"compare:{code}:{month}:{year}",
+                *(f"history:{code}:{months}" for months in (3, 6)),
+                *(f"dashboard:{code}:{months}:{month}:{year}" for months in (3, 6)),
+            )
+        ]
+        return built, keys, await server.cache_ttls(keys)
+
+    built, keys, remaining = asyncio.run(run())
+    assert built == len(keys) == 12
+    assert all(left is not None and left > 0 for left in remaining), dict(zip(keys, remaining))
+    assert remaining[1] <= server.CURRENT_MONTH_TTL
+
+
+def test_prebuilt_entries_are_what_the_routes_serve(stores):
+    import httpx
+    import synthetic_data
+    server = stores
+    (month, year), = server.recent_periods(1)
+
+    async def run():
+        await server.db.districts.insert_one({'district_code': 'UP01', 'district_name': 'UP01'})
+        await synthetic_data.seed_mongo(['UP01'], server.recent_periods(6))
+        await server.prebuild_month(month, year)
+        prebuilt = await server.redis_client.get(server.redis_key(f"compare:UP01:{month}:{year}"))
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            served = await client.get('/api/district/UP01/compare')
+        return prebuilt, served
+
+    prebuilt, served = asyncio.run(run())
+    assert served.status_code == 200
+    assert served.content == prebuilt
@@ -0,0 +1,181 @@
+import asyncio
+
+import httpx
+import pytest
+
+import server
+from server import CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(server.time, 'monotonic', clock)
+    return clock
+
+
+def test_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock.now += 29
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    clock.now += 10
+    assert not breaker.allow()
+    # A probe that never reports back does not block the next one forever
+    clock.now += 20
+    assert breaker.allow()
+
+
+def test_probe_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    # The reset timeout restarts from the failed probe
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_probe_success_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+UPSTREAM_RECORD = {
+    'district_code': 'UP01', 'month': 1, 'year': 2024,
+    'total_workers': 1234, 'work_completed': 5, 'work_ongoing': 6, 'average_wage': 210.5,
+    'budget_allocated': 1000.0, 'budget_spent': 500.0, 'person_days_generated': 4321,
+}
+
+
+@pytest.fixture
+def upstream(stores, monkeypatch):
+    """data.gov.in behind an httpx.MockTransport; set `respond` per test."""
+    calls = []
+    state = {'respond': lambda request: httpx.Response(200, json={'records': [UPSTREAM_RECORD]})}
+
+    def handler(request):
+        calls.append(request)
+        return state['respond'](request)
+
+    monkeypatch.setattr(server, 'USE_DATA_GOV', True)
+    monkeypatch.setattr(server, 'data_gov_breaker', CircuitBreaker(failure_threshold=3, reset_timeout=30))
+    monkeypatch.setattr(server, 'http_client', httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    state['calls'] = calls
+    return state
+
+
+def test_failures_open_the_circuit_and_fall_back_to_mock(upstream):
+    upstream['respond'] = lambda request: httpx.Response(503)
+
+    async def run():
+        return [await server.fetch_performance('UP01', 1, 2024) for _ in range(5)]
+
+    results = asyncio.run(run())
+    assert len(upstream['calls']) == 3
+    assert server.data_gov_breaker.state == CircuitBreaker.OPEN
+    assert all(not authoritative for _, authoritative in results)
+    assert results[0][0] == server.generate_mock_performance_data('UP01', 1, 2024)
+
+
+def test_empty_upstream_result_is_negatively_cached(upstream):
+    upstream['respond'] = lambda request: httpx.Response(200, json={'records': []})
+
+    async def run():
+        first = await server.fetch_performance('UP01', 1, 2024)
+        second = await server.fetch_performance('UP01', 1, 2024)
+        other = await server.fetch_performance('UP01', 2, 2024)
+        return first, second, other, await server.redis_client.pttl(server.redis_key('missing:UP01:1:2024'))
+
+    first, second, other, pttl = asyncio.run(run())
+    assert not first[1] and not second[1] and not other[1]
+    # The repeat is answered from the missing: key; the other month is asked
+    assert len(upstream['calls']) == 2
+    assert 0 < pttl <= server.DATA_GOV_MISSING_TTL * 1000
+    # An empty answer is a healthy upstream
+    assert server.data_gov_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_upstream_rows_are_persisted(upstream):
+    async def run():
+        window = await server.load_performance_window('UP01', [(1, 2024)])
+        stored = await server.db.performance_data.find({}, {'_id': 0}).to_list(None)
+        return window, stored
+
+    window, stored = asyncio.run(run())
+    assert window[(1, 2024)]['total_workers'] == 1234
+    assert [(r['district_code'], r['month'], r['year'], r['total_workers']) for r in stored] == [('UP01', 1, 2024, 1234)]
+
+
+@pytest.mark.parametrize('respond', [
+    lambda request: httpx.Response(500),
+    lambda request: httpx.Response(200, json={'records': []}),
+])
+def test_mock_rows_are_not_persisted(upstream, respond):
+    upstream['respond'] = respond
+
+    async def run():
+        window = await server.load_performance_window('UP01', [(1, 2024), (2, 2024)])
+        return window, await server.db.performance_data.count_documents({})
+
+    window, stored = asyncio.run(run())
+    assert set(window) == {(1, 2024), (2, 2024)}
+    assert window[(1, 2024)]['total_workers'] == server.generate_mock_performance_data('UP01', 1, 2024)['total_workers']
+    assert stored == 0
+
+
+def test_open_circuit_serves_mock_rows_without_calling_upstream(upstream):
+    server.data_gov_breaker.state = CircuitBreaker.OPEN
+    server.data_gov_breaker.opened_at = server.time.monotonic()
+
+    async def run():
+        window = await server.load_performance_window('UP01', [(1, 2024)])
+        return window, await server.db.performance_data.count_documents({})
+
+    window, stored = asyncio.run(run())
+    assert upstream['calls'] == []
+    assert window[(1, 2024)]['district_code'] == 'UP01'
+    assert stored == 0
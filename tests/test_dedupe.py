@@ -0,0 +1,44 @@
+import asyncio
+import logging
+
+
+def test_duplicates_are_kept_until_the_dedupe_step(stores, caplog):
+    import dedupe_performance
+    server = stores
+    rows = [
+        {'district_code': 'UP01', 'month': 1, 'year': 2024, 'total_workers': n}
+        for n in (1, 2, 3)
+    ] + [{'district_code': 'UP01', 'month': 2, 'year': 2024, 'total_workers': 4}]
+
+    async def indexes(collection):
+        return set(await collection.index_information())
+
+    async def startup():
+        await server.db.performance_data.insert_many(rows)
+        await server.ensure_indexes()
+        return (
+            await server.db.performance_data.count_documents({}),
+            await indexes(server.db.performance_data),
+            await indexes(server.db.districts),
+        )
+
+    with caplog.at_level(logging.ERROR):
+        count, performance_indexes, district_indexes = asyncio.run(startup())
+    # Startup deletes nothing and still creates the other indexes
+    assert count == 4
+    assert 'district_period_unique' not in performance_indexes
+    assert 'district_code' in district_indexes
+    assert 'dedupe_performance.py' in caplog.text
+
+    async def dedupe():
+        dry_run = await dedupe_performance.dedupe(dry_run=True)
+        count = await server.db.performance_data.count_documents({})
+        removed = await dedupe_performance.dedupe(dry_run=False)
+        kept = await server.db.performance_data.find({}, {'_id': 0}).sort('month', 1).to_list(None)
+        return dry_run, count, removed, kept, await indexes(server.db.performance_data)
+
+    dry_run, count, removed, kept, performance_indexes = asyncio.run(dedupe())
+    assert (dry_run, count, removed) == (2, 4, 2)
+    # The oldest row of each month is kept
+    assert [r['total_workers'] for r in kept] == [1, 4]
+    assert 'district_period_unique' in performance_indexes
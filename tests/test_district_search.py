@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+import pytest
+
+from district_registry import DistrictRegistry, normalize_name
+
+DISTRICTS = [
+    {'district_code': 'UP01', 'district_name': 'Agra', 'district_name_hi': 'आगरा', 'state_code': 'UP'},
+    {'district_code': 'UP02', 'district_name': 'Aligarh', 'district_name_hi': 'अलीगढ़', 'state_code': 'UP'},
+    {'district_code': 'UP03', 'district_name': 'Ambedkar Nagar', 'district_name_hi': 'अम्बेडकर नगर', 'state_code': 'UP'},
+    {'district_code': 'UP04', 'district_name': 'Amethi', 'district_name_hi': 'अमेठी', 'state_code': 'UP'},
+    {'district_code': 'RJ01', 'district_name': 'Nagaur', 'district_name_hi': 'नागौर', 'state_code': 'RJ'},
+    {'district_code': 'AR01', 'district_name': 'Upper Siang', 'district_name_hi': 'अपर सियांग', 'state_code': 'AR'},
+]
+
+
+@pytest.fixture
+def registry():
+    return DistrictRegistry(DISTRICTS)
+
+
+def codes(results):
+    return [d['district_code'] for d in results]
+
+
+def test_normalize_name():
+    assert normalize_name('  Ambedkar-Nagar ') == 'ambedkar nagar'
+    assert normalize_name('अलीगढ़') == normalize_name('अलीगढ')
+    # The precomposed letter and letter + nukta are the same key
+    assert normalize_name('अलीग\u095d') == normalize_name('अलीग\u0922\u093c') == 'अलीगढ'
+
+
+def test_english_name_prefix(registry):
+    # The code AR01 matches too, and codes come first
+    assert codes(registry.search('a')) == ['AR01', 'UP01', 'UP02', 'UP03', 'UP04']
+    assert codes(registry.search('am')) == ['UP03', 'UP04']
+    assert codes(registry.search('ALI')) == ['UP02']
+    assert codes(registry.search('ambedkar-n')) == ['UP03']
+    assert registry.search('zz') == [] and registry.search(' - ') == []
+
+
+def test_hindi_name_prefix(registry):
+    assert codes(registry.search('आग')) == ['UP01']
+    # With or without the nukta
+    assert codes(registry.search('अलीगढ़')) == codes(registry.search('अलीगढ')) == ['UP02']
+    assert codes(registry.search('अम')) == ['UP03', 'UP04']
+    assert codes(registry.search('नगर')) == ['UP03']
+
+
+def test_full_names_rank_before_later_words(registry):
+    # "Nagaur" starts with the query; "Ambedkar Nagar" only has a word that does
+    assert codes(registry.search('nag')) == ['RJ01', 'UP03']
+    assert codes(registry.search('नाग')) == ['RJ01']
+    assert codes(registry.search('सि')) == ['AR01']
+
+
+def test_codes_rank_before_names(registry):
+    # Every UP code matches "up", ahead of the name "Upper Siang"; codes are
+    # ordered by name among themselves
+    assert codes(registry.search('up')) == ['UP01', 'UP02', 'UP03', 'UP04', 'AR01']
+    assert codes(registry.search('up0')) == ['UP01', 'UP02', 'UP03', 'UP04']
+    assert codes(registry.search('rj01')) == ['RJ01']
+
+
+def test_state_filter_and_limit(registry):
+    assert codes(registry.search('nag', state_code='up')) == ['UP03']
+    assert codes(registry.search('up', limit=2)) == ['UP01', 'UP02']
+
+
+def test_search_route(registry, monkeypatch):
+    import server
+    monkeypatch.setattr(server, 'district_registry', registry)
+
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return [
+                await client.get('/api/districts/search', params=params)
+                for params in ({'q': 'नगर'}, {'q': 'up', 'state_code': 'ar'}, {'q': ''})
+            ]
+
+    hindi, filtered, empty = asyncio.run(run())
+    assert codes(hindi.json()['data']) == ['UP03']
+    assert hindi.json()['data'][0]['district_name_hi'] == 'अम्बेडकर नगर'
+    assert codes(filtered.json()['data']) == ['AR01']
+    assert empty.status_code == 422
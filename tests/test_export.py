@@ -0,0 +1,91 @@
+import asyncio
+import csv
+import io
+
+import httpx
+import orjson
+import pytest
+
+import server
+from server import EXPORT_FIELDS
+
+# November 2023 to March 2024
+PERIODS = [(11, 2023), (12, 2023), (1, 2024), (2, 2024), (3, 2024)]
+CODES = ['MH01', 'UP01', 'UP02']
+
+
+def row(code, month, year):
+    doc = server.new_performance_row(server.generate_mock_performance_data(code, month, year))
+    ts = doc['timestamp']
+    doc['timestamp'] = ts.replace(microsecond=ts.microsecond // 1000 * 1000, tzinfo=None)
+    return doc
+
+
+ROWS = [row(code, m, y) for code in CODES for m, y in PERIODS]
+
+
+@pytest.fixture(params=['documents', 'buckets'])
+def stored(stores, monkeypatch, request):
+    monkeypatch.setattr(stores, 'BUCKETED_STORAGE', request.param == 'buckets')
+    # Several chunks per export
+    monkeypatch.setattr(stores, 'EXPORT_CHUNK_BYTES', 256)
+
+    async def run():
+        await stores.ensure_indexes()
+        await stores.upsert_performance_rows([dict(r) for r in ROWS])
+    asyncio.run(run())
+    return stores
+
+
+def export(server, query):
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return await client.get(f'/api/export/performance?{query}')
+    return asyncio.run(run())
+
+
+def expected(state, periods):
+    return [r for r in ROWS if r['district_code'].startswith(state) and (r['month'], r['year']) in periods]
+
+
+def test_ndjson_across_a_year_boundary(stored):
+    response = export(stored, 'state_code=up&from=2023-12&to=2024-02')
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert response.headers['content-disposition'] == 'attachment; filename="performance_UP_2023-12_2024-02.ndjson"'
+    lines = response.content.decode().splitlines()
+    rows = expected('UP', PERIODS[1:4])
+    assert len(lines) == len(rows) == 6
+    for line, want in zip(lines, rows):
+        got = orjson.loads(line)
+        assert list(got) == list(EXPORT_FIELDS)
+        assert got == {**{f: want[f] for f in EXPORT_FIELDS}, 'timestamp': want['timestamp'].isoformat()}
+
+
+def test_csv_across_a_year_boundary(stored):
+    response = export(stored, 'state_code=UP&from=2023-12&to=2024-02&format=csv')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/csv')
+    reader = csv.reader(io.StringIO(response.content.decode()))
+    assert next(reader) == list(EXPORT_FIELDS)
+    assert list(reader) == [[str(want[f]) for f in EXPORT_FIELDS] for want in expected('UP', PERIODS[1:4])]
+
+
+def test_open_ended_ranges(stored):
+    def periods(query):
+        lines = export(stored, f'state_code=UP&{query}').content.decode().splitlines()
+        return sorted({(r['year'], r['month']) for r in map(orjson.loads, lines)})
+
+    assert periods('from=2024-01') == [(2024, 1), (2024, 2), (2024, 3)]
+    assert periods('to=2023-12') == [(2023, 11), (2023, 12)]
+    assert periods('from=2024-02&to=2024-02') == [(2024, 2)]
+    assert len(periods('')) == len(PERIODS)
+
+
+def test_bad_ranges(stored):
+    assert export(stored, 'state_code=UP&from=2024-02&to=2023-12').status_code == 400
+    assert export(stored, 'state_code=UP&from=2024-13').status_code == 422
+    empty = export(stored, 'state_code=UP&from=2025-01&format=csv')
+    assert empty.status_code == 200
+    assert empty.content.decode() == ','.join(EXPORT_FIELDS) + '\n'
@@ -0,0 +1,85 @@
+import asyncio
+import re
+
+import httpx
+import pytest
+
+import server
+from server import etag_for, etag_matches
+
+TAG = etag_for(b'{"success":true}')
+OPAQUE = TAG[2:]
+
+
+@pytest.mark.parametrize('if_none_match', [
+    TAG,
+    OPAQUE,
+    '*',
+    f'W/"older", {TAG}',
+    f'"older",{OPAQUE} , W/"newer"',
+])
+def test_etag_matches(if_none_match):
+    assert etag_matches(if_none_match, TAG)
+
+
+@pytest.mark.parametrize('if_none_match', [None, '', 'W/"older"', 'W/"older", "newer"', OPAQUE[:-2] + '"'])
+def test_etag_does_not_match(if_none_match):
+    assert not etag_matches(if_none_match, TAG)
+
+
+def max_age(response):
+    return int(re.search(r'max-age=(\d+)', response.headers['cache-control']).group(1))
+
+
+def fetch(server, *requests):
+    """Send (path, headers) pairs to the app in order."""
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return [await client.get(path, headers=headers) for path, headers in requests]
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('tag', ['weak', 'strong', '*', 'list'])
+def test_matching_if_none_match_gets_304(stores, tag):
+    path = '/api/district/UP01/current'
+    first, = fetch(stores, (path, {}))
+    etag = first.headers['etag']
+    assert first.status_code == 200 and etag.startswith('W/"')
+    if_none_match = {'weak': etag, 'strong': etag[2:], '*': '*', 'list': f'W/"older", {etag}, "newer"'}[tag]
+    second, other = fetch(stores, (path, {'If-None-Match': if_none_match}), (path, {'If-None-Match': 'W/"older"'}))
+    assert second.status_code == 304
+    assert second.content == b''
+    assert second.headers['etag'] == etag
+    assert second.headers['vary'] == 'Accept-Encoding'
+    assert other.status_code == 200 and other.content == first.content
+
+
+def test_max_age_is_the_entry_remaining_ttl(stores):
+    path = '/api/district/UP01/current'
+    month, year = server.recent_periods(1)[0]
+    key = f'performance:UP01:{month}:{year}'
+    first, = fetch(stores, (path, {}))
+    assert 0 < max_age(first) <= server.CURRENT_MONTH_TTL
+
+    # An entry another worker wrote 50 minutes ago, read through Redis...
+    asyncio.run(stores.redis_client.expire(server.redis_key(key), 600))
+    stores.local_cache.clear()
+    from_redis, = fetch(stores, (path, {}))
+    assert 590 <= max_age(from_redis) <= 600
+    # ...and then from the L1 copy, which keeps the Redis expiry
+    assert stores.local_cache.get(key) is not None
+    from_l1, = fetch(stores, (path, {}))
+    assert 590 <= max_age(from_l1) <= 600
+    assert from_l1.headers['etag'] == first.headers['etag']
+
+
+def test_batch_max_age_is_its_oldest_row(stores):
+    month, year = server.recent_periods(1)[0]
+    path = f'/api/performance?codes=UP01,UP02&month={month}&year={year}'
+    first, = fetch(stores, (path, {}))
+    assert first.status_code == 200
+    asyncio.run(stores.redis_client.expire(server.redis_key(f'performance:UP02:{month}:{year}'), 120))
+    stores.local_cache.clear()
+    second, = fetch(stores, (path, {}))
+    assert 110 <= max_age(second) <= 120
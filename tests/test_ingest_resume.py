@@ -0,0 +1,136 @@
+import asyncio
+
+import httpx
+import pytest
+
+import ingest
+
+RESOURCE_ID = 'test-resource'
+PAGE_SIZE = 5
+# 23 records: four full pages and a short last one
+RECORDS = [
+    {'district_code': f'UP{i % 6 + 1:02d}', 'month': i // 6 + 1, 'year': 2024, 'total_workers': str(100 + i)}
+    for i in range(23)
+]
+
+
+class Crash(Exception):
+    pass
+
+
+class Upstream:
+    """data.gov.in stand-in serving RECORDS with offset/limit pagination."""
+
+    def __init__(self):
+        self.offsets = []
+        self.fail_from = None
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        assert request.url.path == f'/resource/{RESOURCE_ID}'
+        offset = int(request.url.params['offset'])
+        limit = int(request.url.params['limit'])
+        self.offsets.append(offset)
+        if self.fail_from is not None and offset >= self.fail_from:
+            raise httpx.ConnectError('upstream went away', request=request)
+        return httpx.Response(200, json={'total': len(RECORDS), 'records': RECORDS[offset:offset + limit]})
+
+
+@pytest.fixture(params=['documents', 'buckets'])
+def setup(stores, monkeypatch, tmp_path, request):
+    monkeypatch.setattr(stores, 'BUCKETED_STORAGE', request.param == 'buckets')
+    monkeypatch.setattr(ingest, 'BUCKETED_STORAGE', request.param == 'buckets')
+    asyncio.run(stores.ensure_indexes())
+    upstream = Upstream()
+    return stores, upstream, tmp_path / 'checkpoint.json'
+
+
+def ingest_run(upstream, checkpoint, resume):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as client:
+            return await ingest.run_ingestion(
+                base_url='http://upstream.test', resource_id=RESOURCE_ID, api_key='key',
+                page_size=PAGE_SIZE, checkpoint=checkpoint, resume=resume, client=client,
+            )
+    return asyncio.run(run())
+
+
+def stored_rows(server):
+    async def run():
+        return [r async for r in server.iter_performance_rows({}, sort=True)]
+    return asyncio.run(run())
+
+
+def assert_ingested_once(server):
+    rows = stored_rows(server)
+    keys = [(r['district_code'], r['month'], r['year']) for r in rows]
+    assert len(keys) == len(set(keys)) == len(RECORDS)
+    assert sorted(keys) == sorted((r['district_code'], r['month'], r['year']) for r in RECORDS)
+    assert sorted(r['total_workers'] for r in rows) == [100 + i for i in range(len(RECORDS))]
+
+    async def months_reporting():
+        totals = await server.db.district_fy_totals.find({}, {'_id': 0}).to_list(None)
+        return sum(t['months_reporting'] for t in totals)
+    # Rollups are recomputed per page, so re-ingested pages are not counted twice
+    assert asyncio.run(months_reporting()) == len(RECORDS)
+
+
+def test_full_run(setup):
+    server, upstream, checkpoint = setup
+    stats = ingest_run(upstream, checkpoint, resume=False)
+    assert upstream.offsets == [0, 5, 10, 15, 20]
+    assert (stats['pages'], stats['records'], stats['skipped']) == (5, 23, 0)
+    assert ingest.load_checkpoint(checkpoint, RESOURCE_ID) == len(RECORDS)
+    assert_ingested_once(server)
+
+
+def test_resume_after_upstream_failure(setup, monkeypatch):
+    server, upstream, checkpoint = setup
+    fetch_page = ingest.fetch_page
+    monkeypatch.setattr(ingest, 'fetch_page', lambda *args, **kwargs: fetch_page(*args, retries=0))
+
+    upstream.fail_from = 10
+    with pytest.raises(httpx.ConnectError):
+        ingest_run(upstream, checkpoint, resume=False)
+    assert ingest.load_checkpoint(checkpoint, RESOURCE_ID) == 10
+    assert len(stored_rows(server)) == 10
+
+    upstream.fail_from = None
+    upstream.offsets.clear()
+    stats = ingest_run(upstream, checkpoint, resume=True)
+    assert stats['start_offset'] == 10
+    assert upstream.offsets == [10, 15, 20]
+    assert_ingested_once(server)
+
+
+def test_resume_after_crash_before_checkpoint(setup, monkeypatch):
+    server, upstream, checkpoint = setup
+    save_checkpoint = ingest.save_checkpoint
+    saved = []
+
+    def crash_on_third(path, resource_id, offset):
+        if len(saved) == 2:
+            raise Crash
+        saved.append(offset)
+        save_checkpoint(path, resource_id, offset)
+
+    monkeypatch.setattr(ingest, 'save_checkpoint', crash_on_third)
+    with pytest.raises(Crash):
+        ingest_run(upstream, checkpoint, resume=False)
+    # The third page was written but not checkpointed
+    assert ingest.load_checkpoint(checkpoint, RESOURCE_ID) == 10
+    assert len(stored_rows(server)) == 15
+
+    monkeypatch.setattr(ingest, 'save_checkpoint', save_checkpoint)
+    upstream.offsets.clear()
+    stats = ingest_run(upstream, checkpoint, resume=True)
+    assert upstream.offsets == [10, 15, 20]
+    assert stats['records'] == 13
+    assert_ingested_once(server)
+
+
+def test_checkpoint_of_another_resource_is_ignored(setup):
+    server, upstream, checkpoint = setup
+    ingest.save_checkpoint(checkpoint, 'other-resource', 15)
+    stats = ingest_run(upstream, checkpoint, resume=True)
+    assert stats['start_offset'] == 0
+    assert_ingested_once(server)
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from ranking import RANKED_METRICS, RankEngine, RankTable, budget_utilization, metric_value
+
+
+def rows(values, metric='total_workers'):
+    return [{'district_code': code, metric: value} for code, value in values.items()]
+
+
+def brute_rank(values, code):
+    """Rank and percentile by direct counting, the way the docstring defines them."""
+    value = values[code]
+    above = sum(v > value for v in values.values())
+    below = sum(v < value for v in values.values())
+    ties = sum(v == value for v in values.values())
+    n = len(values)
+    percentile = round((below + (ties - 1) / 2) / (n - 1) * 100, 1) if n > 1 else 100.0
+    return above + 1, percentile
+
+
+def test_rank_and_percentile():
+    values = {'UP01': 10, 'UP02': 40, 'UP03': 20, 'UP04': 30}
+    table = RankTable(rows(values))
+    assert table.rank('UP02', 'total_workers') == {'value': 40, 'rank': 1, 'of': 4, 'percentile': 100.0}
+    assert table.rank('UP01', 'total_workers') == {'value': 10, 'rank': 4, 'of': 4, 'percentile': 0.0}
+    assert table.rank('UP03', 'total_workers')['percentile'] == pytest.approx(33.3)
+
+
+def test_ties_share_the_best_rank():
+    values = {'UP01': 5, 'UP02': 7, 'UP03': 7, 'UP04': 7, 'UP05': 1}
+    table = RankTable(rows(values))
+    for code in values:
+        result = table.rank(code, 'total_workers')
+        assert (result['rank'], result['percentile']) == brute_rank(values, code)
+    assert [table.rank(c, 'total_workers')['rank'] for c in ('UP02', 'UP03', 'UP04', 'UP01', 'UP05')] == [1, 1, 1, 4, 5]
+    # Three-way tie at the top: two of the other four below, plus half of
+    # the two it ties with
+    assert table.rank('UP02', 'total_workers')['percentile'] == 75.0
+
+
+def test_all_tied():
+    table = RankTable(rows({'UP01': 3, 'UP02': 3}))
+    assert table.rank('UP01', 'total_workers') == {'value': 3, 'rank': 1, 'of': 2, 'percentile': 50.0}
+
+
+def test_single_district():
+    table = RankTable(rows({'UP01': 3}))
+    assert len(table) == 1
+    assert table.rank('UP01', 'total_workers') == {'value': 3, 'rank': 1, 'of': 1, 'percentile': 100.0}
+    assert set(table.ranks('UP01')) == set(RANKED_METRICS)
+
+
+def test_missing_metric_and_district():
+    table = RankTable([{'district_code': 'UP01', 'total_workers': 5}, {'district_code': 'UP02'}])
+    # A metric absent from a row counts as 0
+    assert table.rank('UP02', 'total_workers')['value'] == 0
+    assert table.rank('UP02', 'average_wage') == {'value': 0, 'rank': 1, 'of': 2, 'percentile': 50.0}
+    # Metrics the table was not built for, and unknown districts, have no rank
+    assert table.rank('UP01', 'work_ongoing') is None
+    assert table.rank('UP99', 'total_workers') is None
+    assert table.ranks('UP99') is None
+
+
+def test_budget_utilization():
+    assert budget_utilization({'budget_allocated': 200, 'budget_spent': 50}) == 25
+    assert budget_utilization({'budget_allocated': 0, 'budget_spent': 50}) == 0
+    assert metric_value({'budget_allocated': None, 'budget_spent': None}, 'budget_utilization') == 0
+
+
+def test_engine_is_a_bounded_lru(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('ranking.time.monotonic', lambda: now[0])
+    engine = RankEngine(max_tables=2, check_interval=30)
+    tables = {key: RankTable([]) for key in [('UP', 2024, 1), ('UP', 2024, 2), ('MH', 2024, 1)]}
+    keys = list(tables)
+    engine.put(keys[0], 'a', tables[keys[0]])
+    engine.put(keys[1], 'b', tables[keys[1]])
+    assert engine.get(keys[0])[0] == 'a'
+    engine.put(keys[2], 'c', tables[keys[2]])
+    # keys[1] was the least recently used
+    assert engine.get(keys[1]) is None
+    assert engine.fresh(keys[0]) is tables[keys[0]]
+    now[0] += 30
+    assert engine.fresh(keys[0]) is None
+    engine.invalidate([keys[0]])
+    assert engine.get(keys[0]) is None
+
+
+def test_rank_table_matches_state_rankings(stores):
+    import synthetic_data
+    server = stores
+    codes = [f"UP{i:02d}" for i in range(1, 8)]
+    month, year = 1, 2024
+
+    async def run():
+        await synthetic_data.seed_mongo(codes, [(month, year)])
+        rankings = await server.build_state_rankings('UP', 'total_workers', month, year)
+        table = await server.rank_table('UP', month, year)
+        return rankings, {code: table.ranks(code) for code in codes}
+
+    rankings, ranks = asyncio.run(run())
+    expected = {r['district_code']: r['rank'] for r in rankings['rankings']}
+    assert {code: r['total_workers']['rank'] for code, r in ranks.items()} == expected
+    assert all(r['total_workers']['of'] == len(codes) for r in ranks.values())
+
+
+def test_rank_route(stores, monkeypatch):
+    import httpx
+    import synthetic_data
+    server = stores
+    monkeypatch.setattr(server, 'district_registry', server.district_registry)
+    # A district with a numeric (LGD) code is ranked within its stored state
+    codes = ['UP01', 'UP02', '0915']
+
+    async def run():
+        await server.db.districts.insert_one({'district_code': '0915', 'district_name': 'Numeric', 'state_code': 'UP'})
+        await server.refresh_district_registry()
+        await synthetic_data.seed_mongo(codes, [(1, 2024)])
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return [
+                await client.get(url) for url in (
+                    '/api/district/0915/rank?month=1&year=2024',
+                    '/api/district/up01/rank?month=1&year=2024',
+                    '/api/district/UP99/rank?month=1&year=2024',
+                    '/api/district/UP01/rank?month=2&year=2024',
+                    # Numeric but unregistered: no state at all
+                    '/api/district/0999/rank?month=1&year=2024',
+                )
+            ]
+
+    rank_table = server.rank_table
+    asked = []
+
+    async def recording_rank_table(state_code, month, year):
+        asked.append(state_code)
+        return await rank_table(state_code, month, year)
+
+    monkeypatch.setattr(server, 'rank_table', recording_rank_table)
+    numeric, prefixed, unknown, no_data, stateless = asyncio.run(run())
+    assert numeric.status_code == 200
+    assert numeric.json()['data']['state_code'] == 'UP'
+    assert numeric.json()['data']['ranks']['total_workers']['of'] == 3
+    assert prefixed.json()['data']['district_code'] == 'UP01'
+    assert unknown.status_code == 404
+    assert no_data.status_code == 404
+    assert stateless.status_code == 404
+    # The stateless district never reaches rank_table
+    assert '' not in asked and len(asked) == 4
@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+import server
+from snapshot import PerformanceSnapshot, write_snapshot
+
+# A numeric (LGD) code sorts before MH, so UP's rows are split in two ranges
+DISTRICTS = [
+    {'district_code': '0915', 'district_name': 'Numeric', 'state_code': 'UP'},
+    {'district_code': 'MH01', 'district_name': 'Ahmednagar', 'state_code': 'MH'},
+    {'district_code': 'MH02', 'district_name': 'Akola', 'state_code': 'MH'},
+    {'district_code': 'UP01', 'district_name': 'Agra', 'state_code': 'UP'},
+    {'district_code': 'UP02', 'district_name': 'Aligarh', 'state_code': 'UP'},
+]
+# December 2023 to February 2024, so ranges cross a year boundary
+PERIODS = [(12, 2023), (1, 2024), (2, 2024)]
+
+
+def row(code, month, year, n):
+    doc = server.new_performance_row({
+        **server.generate_mock_performance_data(code, month, year),
+        # Exact binary fractions, so float sums do not depend on their order
+        'total_workers': 100 + n % 7 * 10,
+        'average_wage': 200 + n * 0.25,
+        'budget_allocated': 1000.0 + n * 8,
+        'budget_spent': 500.0 + n * 4.5,
+    })
+    ts = doc['timestamp']
+    doc['timestamp'] = ts.replace(microsecond=ts.microsecond // 1000 * 1000, tzinfo=None)
+    return doc
+
+
+ROWS = [
+    row(d['district_code'], m, y, i * len(PERIODS) + j)
+    for i, d in enumerate(DISTRICTS) for j, (m, y) in enumerate(PERIODS)
+]
+
+
+@pytest.fixture(params=['arrow', 'parquet'])
+def built(request, tmp_path):
+    write_snapshot(tmp_path, ROWS, DISTRICTS, fmt=request.param)
+    return PerformanceSnapshot(tmp_path)
+
+
+@pytest.fixture
+def stored(stores, monkeypatch):
+    """The same rows and districts in the in-memory database."""
+    monkeypatch.setattr(stores, 'district_registry', stores.district_registry)
+
+    async def run():
+        await stores.ensure_indexes()
+        await stores.db.districts.insert_many([dict(d) for d in DISTRICTS])
+        await stores.refresh_district_registry()
+        await stores.upsert_performance_rows([dict(r) for r in ROWS])
+    asyncio.run(run())
+    return stores
+
+
+def test_round_trip(built, tmp_path):
+    assert built.num_rows == len(ROWS)
+    assert built.manifest['rows'] == len(ROWS)
+    assert sorted(built.district_codes()) == sorted(d['district_code'] for d in DISTRICTS)
+    assert built.rows(range(built.num_rows)) == sorted(ROWS, key=lambda r: (r['district_code'], r['year'], r['month']))
+    assert [d['district_code'] for d in built.districts('UP')] == ['UP01', 'UP02', '0915']
+    assert built.state_ranges == {'UP': [(0, 3), (9, 15)], 'MH': [(3, 9)]}
+
+
+def test_rebuild_in_the_other_format_replaces_the_first(tmp_path):
+    write_snapshot(tmp_path, ROWS, DISTRICTS, fmt='arrow')
+    write_snapshot(tmp_path, ROWS[:3], DISTRICTS[:1], fmt='parquet')
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['districts.parquet', 'manifest.json', 'performance.parquet']
+    assert PerformanceSnapshot(tmp_path).num_rows == 3
+
+
+def test_empty_snapshot(tmp_path):
+    write_snapshot(tmp_path, [], [])
+    empty = PerformanceSnapshot(tmp_path)
+    assert empty.num_rows == 0
+    assert empty.district_codes() == [] and empty.state_ranges == {}
+    assert empty.window('UP01', PERIODS) == {}
+    assert empty.month(['UP01'], 1, 2024) == {}
+    assert empty.state_totals('UP', 1, 2024, ['total_workers']) == {
+        'districts_reporting': 0, 'average_wage_sum': 0, 'totals': {'total_workers': 0},
+    }
+    assert empty.rankings('UP', 'total_workers', 1, 2024) == []
+    assert list(empty.iter_state_rows('UP', None, None, ['district_code'])) == []
+
+
+def test_missing_snapshot(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        PerformanceSnapshot(tmp_path)
+
+
+def read_through(server, snapshot):
+    """Window, summary, rankings and export rows as the routes read them."""
+    async def run():
+        return {
+            'window': {
+                code: await server.load_performance_window(code, PERIODS)
+                for code in ('0915', 'UP01', 'MH02')
+            },
+            'summary': await server.build_state_summary('UP', 1, 2024),
+            'rankings': [
+                await server.build_state_rankings('UP', metric, 1, 2024, ascending)
+                for metric in ('total_workers', 'budget_utilization') for ascending in (False, True)
+            ],
+            'export': [
+                [r async for r in server.export_rows(state, start, end)]
+                for state, start, end in (('UP', None, None), ('UP', (12, 2023), (1, 2024)), ('MH', (1, 2024), None))
+            ],
+        }
+    server.snapshot = snapshot
+    try:
+        return asyncio.run(run())
+    finally:
+        server.snapshot = None
+
+
+def test_snapshot_reads_match_mongo(stored, built):
+    from_mongo = read_through(stored, None)
+    from_snapshot = read_through(stored, built)
+    assert from_snapshot['window'] == from_mongo['window']
+    assert from_snapshot['window']['0915'] == {(r['month'], r['year']): r for r in ROWS[:3]}
+    assert from_snapshot['summary'] == from_mongo['summary']
+    assert from_snapshot['summary']['districts_reporting'] == 3
+    assert from_snapshot['rankings'] == from_mongo['rankings']
+    assert [r['district_code'] for r in from_snapshot['rankings'][0]['rankings']] == ['UP02', 'UP01', '0915']
+    assert from_snapshot['export'] == from_mongo['export']
+    assert [len(rows) for rows in from_snapshot['export']] == [9, 6, 4]
@@ -0,0 +1,75 @@
+import math
+import random
+
+import pytest
+
+from district_registry import DistrictRegistry, seed_entries
+from spatial import EARTH_RADIUS_KM, SpatialIndex
+
+
+def haversine_km(a, b):
+    (lat1, lon1), (lat2, lon2) = a, b
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlam = phi2 - phi1, math.radians(lon2 - lon1)
+    h = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def brute_force(points, lat, lon, k):
+    ranked = sorted((haversine_km((lat, lon), p), i) for i, p in enumerate(points))
+    return ranked[:k]
+
+
+def assert_matches_brute_force(points, lat, lon, k):
+    got = SpatialIndex(points).nearest(lat, lon, k)
+    expected = brute_force(points, lat, lon, k)
+    assert len(got) == len(expected)
+    for (i, km), (expected_km, _) in zip(got, expected):
+        assert km == pytest.approx(expected_km, abs=1e-6)
+        assert haversine_km((lat, lon), points[i]) == pytest.approx(expected_km, abs=1e-6)
+
+
+@pytest.mark.parametrize('k', [1, 3, 10])
+def test_nearest_matches_brute_force(k):
+    rng = random.Random(11)
+    points = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(500)]
+    for _ in range(50):
+        assert_matches_brute_force(points, rng.uniform(-90, 90), rng.uniform(-180, 180), k)
+
+
+def test_nearest_across_the_antimeridian():
+    points = [(0.0, 179.5), (0.0, -179.5), (0.0, 170.0), (0.0, -170.0), (10.0, 180.0)]
+    got = SpatialIndex(points).nearest(0.0, -179.9, 2)
+    assert [i for i, _ in got] == [1, 0]
+    assert got[1][1] == pytest.approx(haversine_km((0.0, -179.9), (0.0, 179.5)), abs=1e-6)
+    for lon in (179.99, -179.99, 180.0, -180.0):
+        assert_matches_brute_force(points, 0.0, lon, 5)
+
+
+def test_nearest_near_the_poles():
+    rng = random.Random(5)
+    # Longitudes are meaningless at the pole itself and crowd together near it
+    points = [(rng.uniform(80, 90), rng.uniform(-180, 180)) for _ in range(200)]
+    points += [(-89.9, 0.0), (-89.9, 180.0), (90.0, 45.0)]
+    for lat, lon in [(90.0, 0.0), (90.0, -120.0), (89.99, 179.0), (-90.0, 0.0), (-89.95, 90.0)]:
+        assert_matches_brute_force(points, lat, lon, 4)
+    got = SpatialIndex(points).nearest(90.0, 123.0, 1)
+    assert got[0] == (len(points) - 1, pytest.approx(0.0, abs=1e-6))
+
+
+def test_duplicate_points_and_small_k():
+    points = [(26.85, 80.95)] * 3 + [(25.0, 82.0)]
+    index = SpatialIndex(points)
+    assert sorted(i for i, _ in index.nearest(26.85, 80.95, 3)) == [0, 1, 2]
+    assert len(index.nearest(0, 0, 10)) == 4
+    assert index.nearest(0, 0, 0) == []
+    assert SpatialIndex([]).nearest(0, 0, 3) == []
+
+
+def test_registry_nearest_district():
+    registry = DistrictRegistry(seed_entries())
+    located = [d for d in registry.by_code.values() if d['latitude'] is not None]
+    target = located[0]
+    district, km = registry.nearest(target['latitude'], target['longitude'])[0]
+    assert (district['latitude'], district['longitude']) == (target['latitude'], target['longitude'])
+    assert km == pytest.approx(0.0, abs=1e-6)